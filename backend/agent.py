@@ -1,9 +1,11 @@
 """
 Autonomous agent for AI news processing pipeline using LangGraph
-Implements a state graph: scrape → dedupe → summarize → publish
+Implements a state graph: scrape → dedupe → summarize → publish (parallel branches) → finalize
 """
 import os
-from typing import List, Dict, TypedDict, Annotated
+import uuid
+import asyncio
+from typing import List, Dict, TypedDict, Annotated, Callable, Awaitable, Optional
 from datetime import datetime
 import operator
 
@@ -14,11 +16,27 @@ from dedupe import deduplicate_items
 from summaries import batch_summarize
 from publisher_x import post_daily_updates
 from publisher_medium import post_weekly_report
-
-# Importing the newly added reddit scraping code
-from scraper_reddit import get_reddit_headlines
+from publisher_bluesky import publish_daily_to_bluesky
+from publisher_mastodon import publish_daily_to_mastodon
+from publisher_linkedin import publish_to_linkedin
+from publisher_devto import publish_weekly_to_devto
+from tracing import trace_span, traced_node
 
 USE_MOCK_MODE = os.getenv("USE_MOCK_MODE", "True").lower() == "true"
+# Default execution mode of run_agent: graph (stage barriers) or streaming queues
+AGENT_STREAM_MODE = os.getenv("AGENT_STREAM_MODE", "False").lower() == "true"
+# Checkpoint graph runs after every node so failed runs can be resumed (opt in)
+AGENT_CHECKPOINTS = os.getenv("AGENT_CHECKPOINTS", "False").lower() == "true"
+# SQLite file for checkpoints, kept apart from the app database so checkpoint
+# writes never compete with API and scheduler writes for its lock
+AGENT_CHECKPOINT_PATH = os.getenv("AGENT_CHECKPOINT_PATH") or "./agent_checkpoints.db"
+# Summaries covered by the weekly report
+WEEKLY_REPORT_ITEMS = 10
+
+
+def merge_results(left: Dict, right: Dict) -> Dict:
+    """Reducer so parallel publish branches can each add their own result"""
+    return {**(left or {}), **(right or {})}
 
 
 # Define the agent state using TypedDict
@@ -34,37 +52,38 @@ class AgentState(TypedDict):
     step: str
     publish_to_x: bool
     publish_to_medium: bool
+    publish_to: List[str]  # Extra publish branches to run, by PUBLISHERS name
+    publish_results: Annotated[Dict[str, Dict], merge_results]  # Branch name -> publisher result
 
 
 # ============================================
 # LANGGRAPH NODE DEFINITIONS
 # ============================================
 
-async def scrape_node(state: AgentState) -> AgentState:
+async def scrape_node(state: AgentState) -> Dict:
     """
     Node 1: Scrape AI/ML news from all sources
     """
     print("\n🔍 [LangGraph Node] SCRAPE: Fetching news from sources...")
     
     try:
-        raw_items = await scrape_all_sources()
+        # The run does not store what it scrapes, so a 304 would drop the source
+        raw_items = await scrape_all_sources(use_cache=False)
         print(f"   ✅ Scraped {len(raw_items)} items")
         
         return {
-            **state,
             "raw_items": raw_items,
             "step": "scrape_complete"
         }
     except Exception as e:
         print(f"   ❌ Scraping error: {e}")
         return {
-            **state,
             "errors": [f"Scraping error: {str(e)}"],
             "step": "scrape_failed"
         }
 
 
-async def dedupe_node(state: AgentState) -> AgentState:
+async def dedupe_node(state: AgentState) -> Dict:
     """
     Node 2: Deduplicate items using embedding similarity
     """
@@ -81,7 +100,6 @@ async def dedupe_node(state: AgentState) -> AgentState:
             print(f"   📊 {item['title'][:50]}... | Novelty: {item.get('novelty_score', 0):.2f}")
         
         return {
-            **state,
             "unique_items": unique_items,
             "duplicate_items": duplicate_items,
             "step": "dedupe_complete"
@@ -89,13 +107,12 @@ async def dedupe_node(state: AgentState) -> AgentState:
     except Exception as e:
         print(f"   ❌ Deduplication error: {e}")
         return {
-            **state,
             "errors": [f"Deduplication error: {str(e)}"],
             "step": "dedupe_failed"
         }
 
 
-async def summarize_node(state: AgentState) -> AgentState:
+async def summarize_node(state: AgentState) -> Dict:
     """
     Node 3: Generate LLM-powered summaries using Groq
     """
@@ -103,7 +120,7 @@ async def summarize_node(state: AgentState) -> AgentState:
     
     try:
         unique_items = state.get("unique_items", [])
-        summaries = batch_summarize(unique_items)
+        summaries = await batch_summarize(unique_items)
         
         print(f"   ✅ Generated {len(summaries)} summaries")
         
@@ -115,27 +132,21 @@ async def summarize_node(state: AgentState) -> AgentState:
             print(f"   🐦 {sample.get('social_hook', '')[:80]}...")
         
         return {
-            **state,
             "summaries": summaries,
             "step": "summarize_complete"
         }
     except Exception as e:
         print(f"   ❌ Summarization error: {e}")
         return {
-            **state,
             "errors": [f"Summarization error: {str(e)}"],
             "step": "summarize_failed"
         }
 
 
-async def publish_x_node(state: AgentState) -> AgentState:
+async def publish_x_node(state: AgentState) -> Dict:
     """
-    Node 4a: Publish to X (Twitter) - conditional
+    Publish branch: daily updates to X (Twitter)
     """
-    if not state.get("publish_to_x", False):
-        print("\n⏭️  [LangGraph Node] PUBLISH_X: Skipped (not requested)")
-        return {**state, "step": "publish_x_skipped"}
-    
     print("\n🐦 [LangGraph Node] PUBLISH_X: Posting to Twitter...")
     
     try:
@@ -146,27 +157,21 @@ async def publish_x_node(state: AgentState) -> AgentState:
         print(f"   ✅ Posted {result.get('posts_created')} tweets {mode_str}")
         
         return {
-            **state,
             "daily_posts": result.get("posts", []),
-            "step": "publish_x_complete"
+            "publish_results": {"x": result}
         }
     except Exception as e:
         print(f"   ❌ X publishing error: {e}")
         return {
-            **state,
             "errors": [f"X publishing error: {str(e)}"],
-            "step": "publish_x_failed"
+            "publish_results": {"x": {"success": False, "message": str(e)}}
         }
 
 
-async def publish_medium_node(state: AgentState) -> AgentState:
+async def publish_medium_node(state: AgentState) -> Dict:
     """
-    Node 4b: Publish to Medium - conditional
+    Publish branch: weekly report to Medium
     """
-    if not state.get("publish_to_medium", False):
-        print("\n⏭️  [LangGraph Node] PUBLISH_MEDIUM: Skipped (not requested)")
-        return {**state, "step": "publish_medium_skipped"}
-    
     print("\n📝 [LangGraph Node] PUBLISH_MEDIUM: Publishing to Medium...")
     
     try:
@@ -181,20 +186,77 @@ async def publish_medium_node(state: AgentState) -> AgentState:
             print(f"   📎 URL: {result['post_url']}")
         
         return {
-            **state,
             "weekly_report": result,
-            "step": "publish_medium_complete"
+            "publish_results": {"medium": result}
         }
     except Exception as e:
         print(f"   ❌ Medium publishing error: {e}")
         return {
-            **state,
             "errors": [f"Medium publishing error: {str(e)}"],
-            "step": "publish_medium_failed"
+            "publish_results": {"medium": {"success": False, "message": str(e)}}
         }
 
 
-async def finalize_node(state: AgentState) -> AgentState:
+def make_publish_node(name: str, publish: Callable[[List[Dict]], Awaitable[Dict]]):
+    """
+    Wrap a publisher coroutine publish(summaries) -> result as a publish branch node
+    """
+    async def publish_node(state: AgentState) -> Dict:
+        print(f"\n📣 [LangGraph Node] PUBLISH_{name.upper()}: Publishing...")
+        
+        try:
+            result = await publish(state.get("summaries", []))
+            status = "✅" if result.get("success") else "⚠️ "
+            print(f"   {status} {result.get('message', 'Done')}")
+            return {"publish_results": {name: result}}
+        except Exception as e:
+            print(f"   ❌ {name} publishing error: {e}")
+            return {
+                "errors": [f"{name} publishing error: {str(e)}"],
+                "publish_results": {name: {"success": False, "message": str(e)}}
+            }
+    
+    publish_node.__name__ = f"publish_{name}_node"
+    return publish_node
+
+
+# Publish branches, by name; each selected one runs in parallel after summarize
+PUBLISHERS: Dict[str, Callable[[AgentState], Awaitable[Dict]]] = {
+    "x": publish_x_node,
+    "medium": publish_medium_node,
+    "bluesky": make_publish_node("bluesky", publish_daily_to_bluesky),
+    "mastodon": make_publish_node("mastodon", publish_daily_to_mastodon),
+    "linkedin": make_publish_node("linkedin", publish_to_linkedin),
+    "devto": make_publish_node("devto", publish_weekly_to_devto),
+}
+
+
+def register_publisher(name: str, publish: Callable[[List[Dict]], Awaitable[Dict]]) -> None:
+    """
+    Add a publish branch and rebuild the graph
+    
+    Args:
+        name: Branch name, selected with run_agent(publish_to=[name])
+        publish: Coroutine taking the summaries and returning a result dict
+    """
+    global agent_graph
+    PUBLISHERS[name] = make_publish_node(name, publish)
+    agent_graph = build_agent_graph().compile()
+
+
+def route_publishers(state: AgentState) -> List[str]:
+    """Fan out to every requested publish branch (or straight to finalize)"""
+    names = list(state.get("publish_to") or [])
+    if state.get("publish_to_x"):
+        names.append("x")
+    if state.get("publish_to_medium"):
+        names.append("medium")
+    
+    branches = [f"publish_{name}" for name in dict.fromkeys(names) if name in PUBLISHERS]
+    return branches or ["finalize"]
+
+
+async def finalize_node(state: AgentState) -> Dict:
     """
     Final node: Log results and return final state
     """
@@ -206,6 +268,8 @@ async def finalize_node(state: AgentState) -> AgentState:
     print(f"   • Unique: {len(state.get('unique_items', []))} items")
     print(f"   • Summaries: {len(state.get('summaries', []))}")
     print(f"   • X Posts: {len(state.get('daily_posts', []))}")
+    for name, result in (state.get("publish_results") or {}).items():
+        print(f"   • {name}: {'ok' if result.get('success') else 'failed'} - {result.get('message', '')}")
     print(f"   • Errors: {len(state.get('errors', []))}")
     
     if state.get("errors"):
@@ -215,37 +279,52 @@ async def finalize_node(state: AgentState) -> AgentState:
     
     print("=" * 60 + "\n")
     
-    return {**state, "step": "completed"}
+    return {"step": "completed"}
 
 
 # ============================================
 # BUILD THE LANGGRAPH WORKFLOW
 # ============================================
 
+def published_count(name: str) -> Callable[[Dict], int]:
+    """Items a publish branch posted, read from its update"""
+    def count(update: Dict) -> int:
+        result = (update.get("publish_results") or {}).get(name) or {}
+        return result.get("posts_created", result.get("articles_created", 1 if result.get("success") else 0))
+    return count
+
+
 def build_agent_graph() -> StateGraph:
     """
     Construct the LangGraph StateGraph for the agent pipeline
     
     Pipeline Flow:
-    scrape → dedupe → summarize → publish_x → publish_medium → finalize → END
+    scrape → dedupe → summarize → [publish_x | publish_medium | ...] → finalize → END
+    
+    Nodes return only the state keys they change. The selected publish
+    branches run concurrently in one step and finalize runs once all are done.
     """
     # Create the graph with our state schema
     workflow = StateGraph(AgentState)
     
-    # Add all nodes
-    workflow.add_node("scrape", scrape_node)
-    workflow.add_node("dedupe", dedupe_node)
-    workflow.add_node("summarize", summarize_node)
-    workflow.add_node("publish_x", publish_x_node)
-    workflow.add_node("publish_medium", publish_medium_node)
-    workflow.add_node("finalize", finalize_node)
+    # Add all nodes, each traced (see tracing) with its input and output item counts
+    workflow.add_node("scrape", traced_node("scrape", scrape_node, items_out="raw_items"))
+    workflow.add_node("dedupe", traced_node("dedupe", dedupe_node, "raw_items", "unique_items"))
+    workflow.add_node("summarize", traced_node("summarize", summarize_node, "unique_items", "summaries"))
+    for name, node in PUBLISHERS.items():
+        workflow.add_node(f"publish_{name}", traced_node(f"publish_{name}", node, "summaries", published_count(name)))
+    workflow.add_node("finalize", traced_node("finalize", finalize_node, "summaries"))
     
-    # Define the edges (linear flow)
+    # Define the edges
     workflow.add_edge("scrape", "dedupe")
     workflow.add_edge("dedupe", "summarize")
-    workflow.add_edge("summarize", "publish_x")
-    workflow.add_edge("publish_x", "publish_medium")
-    workflow.add_edge("publish_medium", "finalize")
+    workflow.add_conditional_edges(
+        "summarize",
+        route_publishers,
+        [f"publish_{name}" for name in PUBLISHERS] + ["finalize"]
+    )
+    for name in PUBLISHERS:
+        workflow.add_edge(f"publish_{name}", "finalize")
     workflow.add_edge("finalize", END)
     
     # Set entry point
@@ -260,7 +339,9 @@ agent_graph = build_agent_graph().compile()
 
 async def run_agent(
     publish_to_x: bool = False,
-    publish_to_medium: bool = False
+    publish_to_medium: bool = False,
+    publish_to: List[str] = None,
+    stream: bool = None
 ) -> Dict:
     """
     Run the complete agent pipeline using LangGraph
@@ -268,9 +349,13 @@ async def run_agent(
     Args:
         publish_to_x: Whether to publish daily updates to X
         publish_to_medium: Whether to publish weekly report to Medium
+        publish_to: Other publish branches to run in parallel
+            (e.g. ["bluesky", "mastodon", "linkedin", "devto"])
+        stream: Run in streaming mode (see agent_stream) instead of the
+            stage-by-stage graph; defaults to AGENT_STREAM_MODE
         
     Returns:
-        Final state dictionary
+        Final state dictionary, with its "run_id"
     """
     print("\n" + "=" * 60)
     print("🤖 PULSE AI AGENT - LangGraph Pipeline Starting")
@@ -287,13 +372,135 @@ async def run_agent(
         "errors": [],
         "step": "initialized",
         "publish_to_x": publish_to_x,
-        "publish_to_medium": publish_to_medium
+        "publish_to_medium": publish_to_medium,
+        "publish_to": publish_to or [],
+        "publish_results": {}
     }
     
-    # Run the graph
-    final_state = await agent_graph.ainvoke(initial_state)
+    streaming = AGENT_STREAM_MODE if stream is None else stream
+    
+    from db import SessionLocal, create_agent_run
+    run_id = str(uuid.uuid4())
+    db = SessionLocal()
+    try:
+        create_agent_run(db, run_id, {
+            "publish_to_x": publish_to_x,
+            "publish_to_medium": publish_to_medium,
+            "publish_to": publish_to or [],
+            "stream": streaming
+        })
+    finally:
+        db.close()
+    
+    print(f"🧷 Run id: {run_id}")
+    
+    if streaming:
+        from agent_stream import run_agent_streaming
+        return await execute_traced(run_id, run_agent_streaming(initial_state))
+    
+    if not AGENT_CHECKPOINTS:
+        # Run the graph
+        return await execute_traced(run_id, agent_graph.ainvoke(initial_state))
+    
+    return await execute_checkpointed(run_id, initial_state)
+
+
+# ============================================
+# CHECKPOINTED RUNS
+# ============================================
+
+def record_run(run_id: str, **fields) -> None:
+    """Update the agent_runs row (blocking; async code awaits record_run_async)"""
+    from db import SessionLocal, update_agent_run
+    db = SessionLocal()
+    try:
+        update_agent_run(db, run_id, **fields)
+    finally:
+        db.close()
+
+
+async def record_run_async(run_id: str, **fields) -> None:
+    """record_run in a worker thread, off the event loop"""
+    await asyncio.to_thread(record_run, run_id, **fields)
+
+
+async def execute_traced(run_id: str, execution: Awaitable[Dict]) -> Dict:
+    """
+    Await one execution of a run under a run-level trace span and record
+    its outcome; node metrics are stored under the same run id
+    
+    Returns:
+        Final state dictionary, with its "run_id"
+    """
+    try:
+        async with trace_span("run", run_id=run_id):
+            final_state = await execution
+    except Exception as e:
+        print(f"❌ Run {run_id} failed: {e}")
+        await record_run_async(run_id, status="failed", error=str(e))
+        raise
+    
+    await record_run_async(run_id, status="completed", error=None, finished_at=datetime.utcnow())
+    return {**final_state, "run_id": run_id}
+
+
+async def execute_checkpointed(run_id: str, graph_input: Optional[Dict]) -> Dict:
+    """
+    Run (graph_input = initial state) or resume (graph_input = None) a
+    checkpointed run; the state is saved after every node under thread id run_id
+    
+    Returns:
+        Final state dictionary, with its "run_id"
+    """
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+    
+    async def run_graph() -> Dict:
+        config = {"configurable": {"thread_id": run_id}}
+        async with AsyncSqliteSaver.from_conn_string(AGENT_CHECKPOINT_PATH) as checkpointer:
+            graph = build_agent_graph().compile(checkpointer=checkpointer)
+            async for update in graph.astream(graph_input, config, stream_mode="updates"):
+                for node in update:
+                    await record_run_async(run_id, last_node=node)
+            return (await graph.aget_state(config)).values
+    
+    return await execute_traced(run_id, run_graph())
+
+
+async def resume_agent(run_id: str) -> Dict:
+    """
+    Resume a failed or interrupted run from its last checkpoint
+    
+    Nodes that completed (including publish branches that already posted)
+    are not run again; only the remaining nodes execute.
+    
+    Raises:
+        ValueError: If the run is unknown or has no checkpoint
+    """
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+    from db import SessionLocal, get_agent_run
+    
+    db = SessionLocal()
+    try:
+        run = get_agent_run(db, run_id)
+        resumed = run.resumed if run else 0
+    finally:
+        db.close()
+    if run is None:
+        raise ValueError(f"Unknown run {run_id}")
+    
+    config = {"configurable": {"thread_id": run_id}}
+    async with AsyncSqliteSaver.from_conn_string(AGENT_CHECKPOINT_PATH) as checkpointer:
+        snapshot = await build_agent_graph().compile(checkpointer=checkpointer).aget_state(config)
+    if not snapshot.values:
+        raise ValueError(f"Run {run_id} has no checkpoint to resume from")
+    if not snapshot.next:
+        print(f"✅ Run {run_id} already completed")
+        await record_run_async(run_id, status="completed")
+        return {**snapshot.values, "run_id": run_id}
     
-    return final_state
+    print(f"🔁 Resuming run {run_id} at: {', '.join(snapshot.next)}")
+    await record_run_async(run_id, status="running", error=None, resumed=(resumed or 0) + 1)
+    return await execute_checkpointed(run_id, None)
 
 
 def generate_weekly_report(summaries: List[Dict]) -> Dict:
@@ -319,7 +526,7 @@ This week in AI/ML has been exceptionally dynamic, with major breakthroughs acro
 
 """
     
-    for i, summary in enumerate(summaries[:10], 1):
+    for i, summary in enumerate(summaries[:WEEKLY_REPORT_ITEMS], 1):
         title = summary.get('title', 'Untitled') if isinstance(summary, dict) else 'Untitled'
         three_sent = summary.get('three_sentence_summary', '') if isinstance(summary, dict) else ''
         tags = summary.get('tags', []) if isinstance(summary, dict) else []
@@ -0,0 +1,267 @@
+"""
+Streaming execution mode for the agent pipeline
+Items flow source → dedupe → summarizer pool → publishers through bounded
+async queues instead of waiting at a barrier after every stage, so the first
+post can go out while slower sources are still being scraped
+"""
+import os
+import time
+import asyncio
+from typing import Dict, List, Tuple
+
+from scraper import run_scrape_engine, get_scrape_sources, print_scrape_report
+from dedupe import deduplicate_items, EmbeddingMatrix
+from near_dup import MinHashLSH
+from url_index import UrlIndex
+from summaries import batch_summarize, SUMMARY_CONCURRENCY, SUMMARY_BATCH_MAX_ITEMS
+
+# Capacity of each stage queue; a full queue pauses the stage feeding it
+STREAM_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", "32"))
+# Max items between scrape and publish at any time
+STREAM_MAX_IN_FLIGHT = int(os.getenv("STREAM_MAX_IN_FLIGHT", "64"))
+STREAM_SUMMARY_WORKERS = int(os.getenv("STREAM_SUMMARY_WORKERS", str(SUMMARY_CONCURRENCY)))
+# Posts per daily branch per run (publish_x posts the top 5 in batch mode)
+STREAM_POST_LIMIT = int(os.getenv("STREAM_POST_LIMIT", "5"))
+
+# Branches that post item by item as summaries arrive; the others build
+# long-form reports and run once with every summary after the stream drains
+STREAMING_BRANCHES = {"x", "bluesky", "mastodon", "linkedin"}
+
+_DONE = object()
+
+
+async def next_batch(queue: asyncio.Queue, limit: int) -> Tuple[List, bool]:
+    """
+    Wait for one item, then take whatever else is already queued (up to limit)
+
+    Returns:
+        Tuple of (items, whether the end-of-stream marker was reached)
+    """
+    first = await queue.get()
+    if first is _DONE:
+        return [], True
+
+    batch = [first]
+    while len(batch) < limit:
+        try:
+            item = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            break
+        if item is _DONE:
+            return batch, True
+        batch.append(item)
+    return batch, False
+
+
+class StreamingRun:
+    """One streaming run of the pipeline; state mirrors the graph's AgentState"""
+
+    def __init__(self, state: Dict, branches: List[str]):
+        self.state = state
+        self.streaming_branches = [name for name in branches if name in STREAMING_BRANCHES]
+        self.report_branches = [name for name in branches if name not in STREAMING_BRANCHES]
+
+        self.scraped: asyncio.Queue = asyncio.Queue(STREAM_QUEUE_SIZE)
+        self.unique: asyncio.Queue = asyncio.Queue(STREAM_QUEUE_SIZE)
+        self.ready: asyncio.Queue = asyncio.Queue(STREAM_QUEUE_SIZE)
+        self.in_flight = asyncio.Semaphore(STREAM_MAX_IN_FLIGHT)
+
+        # Dedupe state carried from one micro-batch to the next
+        self.url_index = UrlIndex()
+        self.near_dup = MinHashLSH()
+        self.matrix = EmbeddingMatrix.from_items([], extra_capacity=STREAM_QUEUE_SIZE)
+
+        self.start = time.perf_counter()
+        self.stats = {
+            "time_to_first_summary": None,
+            "time_to_first_post": None,
+            "peak_in_flight": 0,
+            "wall_time": None
+        }
+        self._in_flight = 0
+
+    def _elapsed(self) -> float:
+        return round(time.perf_counter() - self.start, 3)
+
+    async def admit(self) -> None:
+        await self.in_flight.acquire()
+        self._in_flight += 1
+        self.stats["peak_in_flight"] = max(self.stats["peak_in_flight"], self._in_flight)
+
+    def release(self, count: int = 1) -> None:
+        for _ in range(count):
+            self._in_flight -= 1
+            self.in_flight.release()
+
+    # ---- Stage 1: sources ----
+
+    async def on_items(self, source: str, items: List[Dict]) -> None:
+        for item in items:
+            await self.admit()
+            try:
+                await self.scraped.put(item)
+            except BaseException:
+                # Cancelled before the item entered the pipeline
+                self.release()
+                raise
+            self.state["raw_items"].append(item)
+
+    async def scrape(self) -> None:
+        try:
+            # Nothing scraped here is stored, so the HTTP cache is bypassed (see get_scrape_sources)
+            _, report = await run_scrape_engine(get_scrape_sources(use_cache=False), on_items=self.on_items)
+            print_scrape_report(report)
+        except Exception as e:
+            print(f"   ❌ Scraping error: {e}")
+            self.state["errors"].append(f"Scraping error: {str(e)}")
+        finally:
+            await self.scraped.put(_DONE)
+
+    # ---- Stage 2: URL, near-duplicate and similarity dedupe ----
+
+    async def dedupe(self) -> None:
+        try:
+            done = False
+            while not done:
+                batch, done = await next_batch(self.scraped, STREAM_QUEUE_SIZE)
+                if not batch:
+                    continue
+                try:
+                    unique_items, duplicate_items = deduplicate_items(
+                        batch, existing_matrix=self.matrix, near_dup=self.near_dup, url_index=self.url_index
+                    )
+                except Exception as e:
+                    print(f"   ❌ Deduplication error: {e}")
+                    self.state["errors"].append(f"Deduplication error: {str(e)}")
+                    self.release(len(batch))
+                    continue
+
+                self.state["duplicate_items"].extend(duplicate_items)
+                self.release(len(duplicate_items))
+                for item in unique_items:
+                    self.url_index.add(item.get("url", ""))
+                    self.state["unique_items"].append(item)
+                    await self.unique.put(item)
+        finally:
+            for _ in range(STREAM_SUMMARY_WORKERS):
+                await self.unique.put(_DONE)
+
+    # ---- Stage 3: summarizer pool ----
+
+    async def summarize_worker(self) -> None:
+        done = False
+        while not done:
+            batch, done = await next_batch(self.unique, SUMMARY_BATCH_MAX_ITEMS)
+            if not batch:
+                continue
+            try:
+                summaries = await batch_summarize(batch)
+            except Exception as e:
+                print(f"   ❌ Summarization error: {e}")
+                self.state["errors"].append(f"Summarization error: {str(e)}")
+                self.release(len(batch))
+                continue
+
+            if self.stats["time_to_first_summary"] is None:
+                self.stats["time_to_first_summary"] = self._elapsed()
+            for summary in summaries:
+                self.state["summaries"].append(summary)
+                await self.ready.put(summary)
+
+    async def summarize(self) -> None:
+        try:
+            await asyncio.gather(*(self.summarize_worker() for _ in range(STREAM_SUMMARY_WORKERS)))
+        finally:
+            await self.ready.put(_DONE)
+
+    # ---- Stage 4: publishers ----
+
+    def merge_update(self, name: str, update: Dict) -> Dict:
+        """Fold one publish node update into the run state; returns this update's own result"""
+        from agent import merge_results
+
+        self.state["errors"].extend(update.get("errors", []))
+        self.state["daily_posts"].extend(update.get("daily_posts", []))
+        if "weekly_report" in update:
+            self.state["weekly_report"] = update["weekly_report"]
+        result = update.get("publish_results", {}).get(name, {})
+
+        merged = result
+        previous = self.state["publish_results"].get(name)
+        if previous and name in self.streaming_branches:
+            merged = {
+                **result,
+                "success": previous.get("success", False) or result.get("success", False),
+                "posts_created": previous.get("posts_created", 0) + result.get("posts_created", 0)
+            }
+        self.state["publish_results"] = merge_results(self.state["publish_results"], {name: merged})
+        return result
+
+    async def publish_one(self, name: str, summary: Dict) -> int:
+        from agent import PUBLISHERS
+
+        update = await PUBLISHERS[name]({"summaries": [summary]})
+        result = self.merge_update(name, update)
+        posts = result.get("posts_created", 1 if result.get("success") else 0)
+        if posts and self.stats["time_to_first_post"] is None:
+            self.stats["time_to_first_post"] = self._elapsed()
+        return posts
+
+    async def publish(self) -> None:
+        posted = {name: 0 for name in self.streaming_branches}
+        while True:
+            summary = await self.ready.get()
+            if summary is _DONE:
+                break
+            try:
+                open_branches = [name for name in self.streaming_branches if posted[name] < STREAM_POST_LIMIT]
+                counts = await asyncio.gather(*(self.publish_one(name, summary) for name in open_branches))
+                for name, count in zip(open_branches, counts):
+                    posted[name] += count
+            finally:
+                self.release()
+
+    async def publish_reports(self) -> None:
+        from agent import PUBLISHERS
+
+        updates = await asyncio.gather(*(
+            PUBLISHERS[name]({"summaries": self.state["summaries"]}) for name in self.report_branches
+        ))
+        for name, update in zip(self.report_branches, updates):
+            self.merge_update(name, update)
+
+    async def run(self) -> Dict:
+        await asyncio.gather(self.scrape(), self.dedupe(), self.summarize(), self.publish())
+        await self.publish_reports()
+        self.stats["wall_time"] = self._elapsed()
+        return self.state
+
+
+async def run_agent_streaming(initial_state: Dict) -> Dict:
+    """
+    Run the pipeline in streaming mode
+
+    Args:
+        initial_state: Initial AgentState, as built by agent.run_agent
+
+    Returns:
+        Final state dictionary, with timings under "stream_stats"
+    """
+    from agent import route_publishers, finalize_node
+
+    branches = [
+        branch[len("publish_"):] for branch in route_publishers(initial_state)
+        if branch.startswith("publish_")
+    ]
+    print(f"🌊 Streaming mode: queues of {STREAM_QUEUE_SIZE}, at most {STREAM_MAX_IN_FLIGHT} items in flight, "
+          f"{STREAM_SUMMARY_WORKERS} summarizers, branches: {', '.join(branches) or 'none'}")
+
+    run = StreamingRun(initial_state, branches)
+    state = await run.run()
+    state.update(await finalize_node(state))
+    state["stream_stats"] = run.stats
+
+    print(f"⏱️  First summary after {run.stats['time_to_first_summary']}s, "
+          f"first post after {run.stats['time_to_first_post']}s, "
+          f"done in {run.stats['wall_time']}s (peak {run.stats['peak_in_flight']} in flight)")
+    return state
@@ -0,0 +1,400 @@
+"""
+Approximate nearest-neighbour index over news item embeddings
+Lets deduplication query the top-k closest archived items instead of
+comparing against every stored embedding
+
+Backends (DEDUPE_INDEX):
+- "none":  disabled, dedupe compares against the latest rows loaded from the DB
+- "exact": brute-force search over the whole archive (reference for recall)
+- "ivf":   inverted-file index, k-means coarse quantizer in pure NumPy
+"""
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+from dedupe import EMBEDDING_DIM, EmbeddingMatrix, to_vector
+from embedding_store import get_embedding_store
+
+DEDUPE_INDEX = os.getenv("DEDUPE_INDEX", "none").lower()
+ANN_INDEX_PATH = os.getenv("ANN_INDEX_PATH", "./ann_index.npz")
+ANN_TOP_K = int(os.getenv("ANN_TOP_K", "10"))
+ANN_NLIST = int(os.getenv("ANN_NLIST", "64"))
+ANN_NPROBE = int(os.getenv("ANN_NPROBE", "8"))
+# IVF retrains its centroids when it has grown by this factor since the last training
+ANN_RETRAIN_FACTOR = float(os.getenv("ANN_RETRAIN_FACTOR", "2"))
+
+# IVF trains its centroids once it holds this many vectors per list
+MIN_POINTS_PER_LIST = 16
+
+
+class VectorIndex:
+    """
+    Base index: stores vectors with their news item ids and a running sum
+
+    The running sum lets novelty (mean similarity to the whole archive) be
+    computed in O(dim) without touching every row.
+    """
+    kind = "base"
+
+    def __init__(self, dim: int = EMBEDDING_DIM, top_k: int = ANN_TOP_K):
+        self.dim = dim
+        self.top_k = top_k
+        self.vectors = EmbeddingMatrix(dim=dim)
+        self.ids: List[int] = []
+        self.indexed = set()  # News item ids already in the index
+        self.sum_vector = np.zeros(dim, dtype=np.float64)
+        self.dirty = False
+        self._id_array: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, ids: List[int], vectors: np.ndarray) -> None:
+        """Add vectors (rows) for the given news item ids; ids already indexed are skipped"""
+        new = []
+        for position, i in enumerate(ids):
+            if int(i) not in self.indexed:
+                self.indexed.add(int(i))
+                new.append(position)
+        if len(new) < len(ids):
+            ids = [ids[position] for position in new]
+            vectors = vectors[new]
+        if not len(ids):
+            return
+        start = len(self)
+        self.vectors.extend(vectors)
+        self.ids.extend(int(i) for i in ids)
+        self.sum_vector += vectors.sum(axis=0, dtype=np.float64)
+        self._id_array = None
+        self.dirty = True
+        self._on_add(start, len(self))
+
+    def id_array(self) -> np.ndarray:
+        if self._id_array is None:
+            self._id_array = np.asarray(self.ids, dtype=np.int64)
+        return self._id_array
+
+    def search(self, vector: np.ndarray, k: int = ANN_TOP_K) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the k rows with the highest inner product with `vector`
+
+        Returns:
+            Tuple of (news item ids, inner products), best first
+        """
+        positions = self._candidates(vector)
+        rows = self.vectors.rows if positions is None else self.vectors.rows[positions]
+        if not len(rows):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        scores = rows @ vector
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        ids = self.id_array()[top if positions is None else positions[top]]
+        return ids, scores[top]
+
+    def save(self, path: str) -> None:
+        """Persist the index atomically (write to a temp file, then rename)"""
+        tmp_path = path + ".tmp.npz"
+        np.savez(
+            tmp_path,
+            kind=np.array(self.kind),
+            vectors=self.vectors.rows,
+            ids=self.id_array(),
+            **self._extra_state()
+        )
+        os.replace(tmp_path, path)
+        self.dirty = False
+
+    def _load_state(self, data) -> None:
+        ids = data["ids"]
+        if len(ids):
+            self.add(ids.tolist(), data["vectors"])
+        self.dirty = False
+
+    def _candidates(self, vector: np.ndarray) -> Optional[np.ndarray]:
+        """Row positions to score for a query, or None for all rows"""
+        return None
+
+    def _on_add(self, start: int, end: int) -> None:
+        pass
+
+    def _extra_state(self) -> Dict[str, np.ndarray]:
+        return {}
+
+
+class ExactIndex(VectorIndex):
+    """Brute-force index: scores every row, exact top-k"""
+    kind = "exact"
+
+
+class IVFIndex(VectorIndex):
+    """
+    Inverted-file index
+
+    Rows are clustered around `nlist` k-means centroids; a query only scores
+    the rows of its `nprobe` nearest clusters. Until there are enough rows
+    to train the centroids it behaves like ExactIndex. The centroids are
+    retrained whenever the index has grown by `retrain_factor` since they
+    were fitted, so the clusters follow the archive as it drifts.
+
+    Dedupe ranks by inner product, which L2 clusters do not preserve, so rows
+    are clustered with an extra coordinate sqrt(max_norm^2 - |r|^2). With the
+    query's extra coordinate at 0, L2 distance in that space orders rows
+    exactly like inner product.
+    """
+    kind = "ivf"
+
+    def __init__(self, dim: int = EMBEDDING_DIM, nlist: int = ANN_NLIST, nprobe: int = ANN_NPROBE,
+                 max_norm: float = None, retrain_factor: float = ANN_RETRAIN_FACTOR):
+        super().__init__(dim=dim)
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.retrain_factor = retrain_factor
+        self.trained_size = 0  # Rows in the index when the centroids were last fitted
+        # Hash embeddings have coordinates in [0, 1], so |r| <= sqrt(dim)
+        self.max_norm = max_norm or float(np.sqrt(dim))
+        self.centroids: Optional[np.ndarray] = None
+        self.lists: List[List[int]] = []
+        self._list_arrays: Dict[int, np.ndarray] = {}
+
+    def train(self, iterations: int = 10, sample_size: int = 20000, seed: int = 0) -> None:
+        """Fit the centroids with k-means on (a sample of) the stored rows and reassign every row"""
+        rows = self._augment(self.vectors.rows)
+        rng = np.random.default_rng(seed)
+        sample = rows if len(rows) <= sample_size else rows[rng.choice(len(rows), sample_size, replace=False)]
+        nlist = min(self.nlist, len(sample))
+
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(iterations):
+            labels = self._nearest_centroids(sample, centroids)
+            for c in range(nlist):
+                members = sample[labels == c]
+                if len(members):
+                    centroids[c] = members.mean(axis=0)
+
+        self.centroids = centroids
+        self.lists = [[] for _ in range(nlist)]
+        self._list_arrays = {}
+        self._assign(0, len(rows))
+        self.trained_size = len(rows)
+        self.dirty = True
+
+    def _on_add(self, start: int, end: int) -> None:
+        if self.centroids is None:
+            if len(self) >= self.nlist * MIN_POINTS_PER_LIST:
+                self.train()
+        elif len(self) >= self.trained_size * self.retrain_factor:
+            print(f"  Retraining IVF centroids ({self.trained_size} -> {len(self)} rows)")
+            self.train()
+        else:
+            self._assign(start, end)
+
+    def _augment(self, rows: np.ndarray) -> np.ndarray:
+        norms = (rows.astype(np.float64) ** 2).sum(axis=1)
+        extra = np.sqrt(np.maximum(self.max_norm ** 2 - norms, 0.0)).astype(np.float32)
+        return np.hstack([rows, extra[:, None]])
+
+    def _assign(self, start: int, end: int) -> None:
+        labels = self._nearest_centroids(self._augment(self.vectors.rows[start:end]), self.centroids)
+        for position, label in zip(range(start, end), labels.tolist()):
+            self.lists[label].append(position)
+            self._list_arrays.pop(label, None)
+
+    @staticmethod
+    def _nearest_centroids(rows: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        # argmin ||r - c||^2 == argmin (||c||^2 - 2 r.c)
+        distances = (centroids ** 2).sum(axis=1)[None, :] - 2.0 * rows @ centroids.T
+        return distances.argmin(axis=1)
+
+    def _candidates(self, vector: np.ndarray) -> Optional[np.ndarray]:
+        if self.centroids is None:
+            return None
+        probes = self._nearest_probes(vector)
+        positions = [self._list_array(p) for p in probes.tolist() if self.lists[p]]
+        if not positions:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(positions)
+
+    def _list_array(self, label: int) -> np.ndarray:
+        if label not in self._list_arrays:
+            self._list_arrays[label] = np.asarray(self.lists[label], dtype=np.int64)
+        return self._list_arrays[label]
+
+    def _nearest_probes(self, vector: np.ndarray) -> np.ndarray:
+        # Query is (vector, 0) in the augmented space
+        distances = (self.centroids ** 2).sum(axis=1) - 2.0 * self.centroids[:, :self.dim] @ vector
+        nprobe = min(self.nprobe, len(distances))
+        return np.argpartition(distances, nprobe - 1)[:nprobe]
+
+    def _extra_state(self) -> Dict[str, np.ndarray]:
+        # Assignments are recomputed from the centroids on load
+        if self.centroids is None:
+            return {}
+        return {"centroids": self.centroids, "trained_size": np.array(self.trained_size)}
+
+    def _load_state(self, data) -> None:
+        if "centroids" not in data:
+            super()._load_state(data)
+            return
+        # Restore centroids first so loading does not retrain
+        self.centroids = data["centroids"]
+        self.trained_size = int(data["trained_size"]) if "trained_size" in data else len(data["ids"])
+        self.lists = [[] for _ in range(len(self.centroids))]
+        super()._load_state(data)
+
+
+INDEX_BACKENDS = {
+    "exact": ExactIndex,
+    "ivf": IVFIndex,
+}
+
+_index: Optional[VectorIndex] = None
+
+
+def create_index(backend: str = DEDUPE_INDEX) -> VectorIndex:
+    """Create an empty index for a backend name"""
+    if backend not in INDEX_BACKENDS:
+        raise ValueError(f"Unknown dedupe index backend: {backend}")
+    return INDEX_BACKENDS[backend]()
+
+
+def load_index(path: str = ANN_INDEX_PATH, backend: str = DEDUPE_INDEX) -> VectorIndex:
+    """Load an index from disk, or create an empty one if missing or of another backend"""
+    index = create_index(backend)
+    if not os.path.exists(path):
+        return index
+
+    try:
+        with np.load(path) as data:
+            if str(data["kind"]) != backend:
+                print(f"  ⚠️  ANN index on disk is '{data['kind']}', rebuilding as '{backend}'")
+                return index
+            index._load_state(data)
+    except Exception as e:
+        print(f"  ⚠️  Could not load ANN index from {path}, rebuilding: {e}")
+        index = create_index(backend)
+    return index
+
+
+def sync_from_store(index: VectorIndex, store) -> int:
+    """
+    Add every stored embedding whose news item id is not in the index yet
+    (rows committed out of id order included)
+
+    Returns:
+        Number of rows added
+    """
+    new_rows = np.flatnonzero(~np.isin(store.ids, index.id_array()))
+    if not len(new_rows):
+        return 0
+    index.add(store.ids[new_rows].tolist(), np.asarray(store.matrix[new_rows]))
+    return len(new_rows)
+
+
+def get_ann_index() -> Optional[VectorIndex]:
+    """
+    Get the process-wide index, loading it from disk on first use
+    Embeddings stored since the last sync (by any process) are added first
+
+    Returns:
+        The index, or None if DEDUPE_INDEX is "none"
+    """
+    global _index
+    if DEDUPE_INDEX == "none":
+        return None
+
+    if _index is None:
+        _index = load_index()
+    added = sync_from_store(_index, get_embedding_store())
+    if added:
+        print(f"  Indexed {added} archived items ({len(_index)} total)")
+    return _index
+
+
+def index_news_item(news_item_id: int, vector: np.ndarray) -> None:
+    """Add the embedding of a newly inserted news item to the loaded index"""
+    index_news_items([news_item_id], vector[None, :])
+
+
+def index_news_items(news_item_ids: List[int], vectors: np.ndarray) -> None:
+    """Add the embeddings of newly inserted news items to the loaded index"""
+    if _index is not None:
+        _index.add(news_item_ids, vectors)
+
+
+def save_ann_index(path: str = ANN_INDEX_PATH) -> None:
+    """Persist the loaded index if it changed"""
+    if _index is not None and _index.dirty:
+        _index.save(path)
+
+
+def recall_report(vectors: np.ndarray, queries: np.ndarray, k: int = ANN_TOP_K,
+                  nlist: int = ANN_NLIST, nprobes: List[int] = None) -> List[Dict]:
+    """
+    Measure IVF recall@k and query time against exact search
+
+    Args:
+        vectors: Archive to index
+        queries: Query vectors
+        k: Neighbours per query
+        nlist: Number of IVF lists
+        nprobes: nprobe values to try
+
+    Returns:
+        One row per nprobe with recall and mean query time (ms)
+    """
+    ids = list(range(1, len(vectors) + 1))
+    exact = ExactIndex(dim=vectors.shape[1])
+    exact.add(ids, vectors)
+
+    start = time.perf_counter()
+    truth = [set(exact.search(q, k)[0].tolist()) for q in queries]
+    exact_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    ivf = IVFIndex(dim=vectors.shape[1], nlist=nlist)
+    ivf.add(ids, vectors)
+    if ivf.centroids is None:
+        ivf.train()
+
+    report = []
+    for nprobe in nprobes or [1, 2, 4, 8, 16, 32]:
+        ivf.nprobe = nprobe
+        start = time.perf_counter()
+        found = [set(ivf.search(q, k)[0].tolist()) for q in queries]
+        ivf_ms = (time.perf_counter() - start) * 1000 / len(queries)
+        recall = sum(len(f & t) for f, t in zip(found, truth)) / max(1, sum(len(t) for t in truth))
+        report.append({
+            "nprobe": nprobe,
+            "recall": round(recall, 4),
+            "ivf_ms": round(ivf_ms, 3),
+            "exact_ms": round(exact_ms, 3)
+        })
+    return report
+
+
+if __name__ == "__main__":
+    # Usage: python ann_index.py [archive_size] [num_queries]
+    # Uses embeddings from the database if there are any, else random ones
+    from dedupe import generate_embedding
+
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    num_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    store = get_embedding_store()
+    if len(store) >= num_queries:
+        vectors = np.asarray(store.matrix[:size])
+        print(f"Using {len(vectors)} embeddings from the embedding store")
+    else:
+        vectors = np.stack([to_vector(generate_embedding(str(i))) for i in range(size)])
+        print(f"Using {len(vectors)} synthetic embeddings")
+
+    rng = np.random.default_rng(1)
+    queries = vectors[rng.choice(len(vectors), num_queries, replace=False)]
+
+    print(f"Recall@{ANN_TOP_K} vs exact search (nlist={ANN_NLIST})")
+    print(f"{'nprobe':>7} {'recall':>8} {'ivf ms':>8} {'exact ms':>9}")
+    for row in recall_report(vectors, queries):
+        print(f"{row['nprobe']:>7} {row['recall']:>8.4f} {row['ivf_ms']:>8.3f} {row['exact_ms']:>9.3f}")
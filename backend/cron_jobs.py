@@ -7,10 +7,11 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from db import SessionLocal, get_active_subscribers, update_subscriber_last_sent
 from email_service import send_daily_report_email
-from db import get_summaries_by_date, NewsItemDB, get_news_items, save_news_item, save_summary
+from db import get_enriched_summaries, bulk_save_news_items
 from scraper import scrape_all_sources
-from dedupe import deduplicate_items
-from summaries import batch_summarize
+from dedupe import deduplicate_against_archive
+from ann_index import save_ann_index
+from summaries import summarize_backlog
 
 
 async def refresh_content(db):
@@ -25,52 +26,17 @@ async def refresh_content(db):
         raw_items = await scrape_all_sources()
         print(f"  Scraped {len(raw_items)} total items")
         
-        # Get existing items from database
-        existing_items_db = get_news_items(db, limit=1000)
-        existing_items = [
-            {
-                "title": item.title,
-                "url": item.url,
-                "embedding": item.embedding if item.embedding else []
-            }
-            for item in existing_items_db
-        ]
-        
-        # Deduplicate
-        unique_items, duplicate_items = deduplicate_items(raw_items, existing_items)
-        print(f"  After dedup: {len(unique_items)} unique, {len(duplicate_items)} duplicates")
-        
-        # Save unique items to database
-        saved_count = 0
-        for item in unique_items:
-            try:
-                save_news_item(db, item)
-                saved_count += 1
-            except Exception as e:
-                print(f"  ⚠️  Error saving item: {e}")
-                continue
+        # Deduplicate against the stored archive
+        unique_items, duplicate_items = deduplicate_against_archive(db, raw_items)
         
+        # Save unique items to database in one transaction
+        _, saved_count = bulk_save_news_items(db, unique_items)
         print(f"  ✅ Saved {saved_count} new items")
+        save_ann_index()
         
-        # Step 2: Generate summaries for new items
-        if saved_count > 0:
-            news_items_db = get_news_items(db, limit=100)
-            news_items = [
-                {
-                    "id": item.id,
-                    "title": item.title,
-                    "content": item.content,
-                    "url": item.url
-                }
-                for item in news_items_db
-            ]
-            
-            summaries = batch_summarize(news_items)
-            
-            for summary in summaries:
-                save_summary(db, summary)
-            
-            print(f"  ✅ Generated {len(summaries)} summaries")
+        # Step 2: Generate summaries for every item still missing one
+        generated = await summarize_backlog(db)
+        print(f"  ✅ Generated {generated} summaries")
         
         return True
         
@@ -104,25 +70,14 @@ async def send_daily_emails_to_subscribers():
         await refresh_content(db)
         
         # Get today's summaries
-        summaries_db = get_summaries_by_date(db, datetime.utcnow())
+        # Today's summaries with their news item titles, in one query
+        summaries = get_enriched_summaries(db, datetime.utcnow())
         
-        if not summaries_db:
+        if not summaries:
             print("📭 No summaries available for today")
             return
         
-        print(f"📰 Found {len(summaries_db)} summaries for today")
-        
-        # Fetch news items and combine with summaries
-        summaries = []
-        for s in summaries_db:
-            news_item = db.query(NewsItemDB).filter(NewsItemDB.id == s.news_item_id).first()
-            
-            summaries.append({
-                "title": news_item.title if news_item else "Untitled",
-                "three_sentence_summary": s.three_sentence_summary,
-                "tags": s.tags,
-                "created_date": s.created_date
-            })
+        print(f"📰 Found {len(summaries)} summaries for today")
         
         # Send email to each subscriber
         sent_count = 0
@@ -8,7 +8,7 @@ import asyncio
 import os
 from datetime import datetime
 from email_service import send_daily_report_email
-from db import get_db, get_summaries_by_date, NewsItemDB
+from db import get_db, get_enriched_summaries
 from sqlalchemy.orm import Session
 
 
@@ -21,23 +21,13 @@ async def send_daily_email_job():
         db = next(get_db())
         
         # Get today's summaries
-        summaries_db = get_summaries_by_date(db, datetime.utcnow())
+        # Today's summaries with their news item titles, in one query
+        summaries = get_enriched_summaries(db, datetime.utcnow())
         
-        if not summaries_db:
+        if not summaries:
             print("⚠️  No summaries found for today, skipping email")
             return
         
-        # Prepare summaries with titles
-        summaries = []
-        for s in summaries_db:
-            news_item = db.query(NewsItemDB).filter(NewsItemDB.id == s.news_item_id).first()
-            summaries.append({
-                'title': news_item.title if news_item else 'Untitled',
-                'three_sentence_summary': s.three_sentence_summary,
-                'social_hook': s.social_hook,
-                'tags': s.tags
-            })
-        
         # Get recipient from environment variable
         recipient = os.getenv("DAILY_EMAIL_RECIPIENT", os.getenv("RECIPIENT_EMAIL", ""))
         
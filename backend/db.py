@@ -2,18 +2,86 @@
 Database setup and helper functions using SQLite
 """
 import os
-from datetime import datetime
-from typing import List, Optional
-from sqlalchemy import create_engine, Column, Integer, String, Text, Float, Boolean, DateTime, JSON
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import create_engine, event, inspect, select, func, tuple_, Index, ForeignKey, Column, Integer, BigInteger, String, Text, Float, Boolean, DateTime, JSON, LargeBinary
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.orm import sessionmaker, relationship, joinedload, Session
+from sqlalchemy.exc import IntegrityError
 from dotenv import load_dotenv
 
 load_dotenv()
 
 # Database configuration
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./pulse.db")
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {})
+# "default" keeps the driver defaults (rollback journal, full sync); opt in to
+# "production" to tune SQLite for concurrent API and scheduler writes and size the pool
+DB_PROFILE = os.getenv("DB_PROFILE", "default").lower()
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "16"))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))  # Page cache per connection
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """
+    Production SQLite settings, applied to every new pooled connection
+    
+    WAL lets readers run while one writer commits, synchronous=NORMAL
+    fsyncs only at WAL checkpoints (still durable against app crashes), and
+    busy_timeout makes a blocked writer wait for the lock instead of failing.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def is_file_sqlite(url: str) -> bool:
+    """Whether url is an on-disk SQLite database (any driver)"""
+    database = url.split("://", 1)[-1]
+    return url.startswith("sqlite") and database not in ("", "/") and ":memory:" not in database
+
+
+def engine_options(url: str, profile: str = DB_PROFILE) -> dict:
+    """
+    create_engine / create_async_engine arguments for url with the given storage profile
+    
+    Args:
+        url: SQLAlchemy database URL
+        profile: "production" or "default" (see DB_PROFILE)
+    """
+    is_sqlite = url.startswith("sqlite")
+    connect_args = {"check_same_thread": False} if is_sqlite else {}
+    
+    # In-memory SQLite lives in a single connection; there is nothing to tune or pool
+    if profile != "production" or (is_sqlite and not is_file_sqlite(url)):
+        return {"connect_args": connect_args}
+    
+    if is_sqlite:
+        connect_args["timeout"] = SQLITE_BUSY_TIMEOUT_MS / 1000
+    return {
+        "connect_args": connect_args,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_pre_ping": True
+    }
+
+
+def create_db_engine(url: str = DATABASE_URL, profile: str = DB_PROFILE):
+    """Create the sync engine for url with the given storage profile"""
+    db_engine = create_engine(url, **engine_options(url, profile))
+    if profile == "production" and is_file_sqlite(url):
+        event.listen(db_engine, "connect", apply_sqlite_pragmas)
+    return db_engine
+
+
+engine = create_db_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -30,21 +98,28 @@ class NewsItemDB(Base):
     content = Column(Text, nullable=True)
     published_date = Column(DateTime, nullable=True)
     scraped_date = Column(DateTime, default=datetime.utcnow)
-    embedding = Column(JSON, nullable=True)  # Stored as JSON array
+    embedding = Column(JSON, nullable=True)  # Legacy; embeddings now live in embedding_store
     novelty_score = Column(Float, nullable=True)
     is_duplicate = Column(Boolean, default=False)
+    
+    summary = relationship("SummaryDB", back_populates="news_item", uselist=False)
 
 
 class SummaryDB(Base):
     """SQLAlchemy model for summaries"""
     __tablename__ = "summaries"
+    # One summary per news item; bulk inserts skip conflicts on this index
+    __table_args__ = (Index("uq_summaries_news_item_id", "news_item_id", unique=True),)
     
     id = Column(Integer, primary_key=True, index=True)
-    news_item_id = Column(Integer, index=True)
+    news_item_id = Column(Integer, ForeignKey("news_items.id"))
     three_sentence_summary = Column(Text)
     social_hook = Column(String)
     tags = Column(JSON)  # Stored as JSON array
-    created_date = Column(DateTime, default=datetime.utcnow)
+    # Serves date ranges and (created_date, id) keyset pages; SQLite keeps the rowid in the index
+    created_date = Column(DateTime, default=datetime.utcnow, index=True)
+    
+    news_item = relationship("NewsItemDB", back_populates="summary")
 
 
 class DailyReportDB(Base):
@@ -108,10 +183,131 @@ class EmailSubscriberDB(Base):
     last_sent = Column(DateTime, nullable=True)
 
 
+class HttpCacheDB(Base):
+    """SQLAlchemy model for HTTP validators of scraped URLs (conditional GET cache)"""
+    __tablename__ = "http_cache"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    url = Column(String, unique=True, index=True)
+    source = Column(String, index=True)
+    etag = Column(String, nullable=True)
+    last_modified = Column(String, nullable=True)
+    content_length = Column(Integer, default=0)  # Body size of the last full download
+    parse_time = Column(Float, default=0.0)  # Seconds spent parsing the last full download
+    not_modified_count = Column(Integer, default=0)
+    bytes_saved = Column(Integer, default=0)
+    parse_time_saved = Column(Float, default=0.0)
+    last_checked = Column(DateTime, default=datetime.utcnow)
+
+
+class MinHashSignatureDB(Base):
+    """SQLAlchemy model for MinHash signatures of news items (near-duplicate detection)"""
+    __tablename__ = "minhash_signatures"
+    
+    news_item_id = Column(Integer, primary_key=True)
+    signature = Column(LargeBinary)  # NUM_PERM uint32 values
+
+
+class LSHBucketDB(Base):
+    """SQLAlchemy model for LSH band buckets pointing at news items"""
+    __tablename__ = "lsh_buckets"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    bucket_key = Column(BigInteger, index=True)  # Hash of (band number, band values)
+    news_item_id = Column(Integer, index=True)
+
+
+class SummaryCacheDB(Base):
+    """SQLAlchemy model for cached LLM summaries, keyed by a hash of the prompt inputs"""
+    __tablename__ = "summary_cache"
+    
+    key = Column(String(64), primary_key=True)  # sha256 of (model, prompt version, title, content)
+    model = Column(String)
+    prompt_version = Column(String)
+    summary = Column(JSON)  # three_sentence_summary, social_hook, tags
+    hits = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    last_used = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class AgentRunDB(Base):
+    """SQLAlchemy model for agent pipeline runs (resumable via LangGraph checkpoints)"""
+    __tablename__ = "agent_runs"
+    
+    id = Column(String(36), primary_key=True)  # Run id, also the checkpoint thread id
+    status = Column(String, default="running", index=True)  # running, completed, failed
+    last_node = Column(String, nullable=True)  # Last node that completed
+    params = Column(JSON)  # run_agent arguments
+    error = Column(Text, nullable=True)
+    resumed = Column(Integer, default=0)
+    started_at = Column(DateTime, default=datetime.utcnow, index=True)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class NodeMetricDB(Base):
+    """SQLAlchemy model for per-node metrics of agent runs (see tracing)"""
+    __tablename__ = "node_metrics"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    run_id = Column(String(36), index=True)
+    node = Column(String)  # Graph node name, or "run" for the whole execution
+    started_at = Column(DateTime, default=datetime.utcnow)
+    wall_time = Column(Float)  # Seconds
+    items_in = Column(Integer, default=0)
+    items_out = Column(Integer, default=0)
+    llm_calls = Column(Integer, default=0)
+    llm_tokens = Column(Integer, default=0)
+    http_requests = Column(Integer, default=0)
+    http_bytes = Column(BigInteger, default=0)
+    peak_memory = Column(BigInteger, default=0)  # Bytes of traced Python allocations
+    error = Column(Text, nullable=True)
+
+
 # Create all tables
 def init_db():
     """Initialize database tables"""
     Base.metadata.create_all(bind=engine)
+    
+    # Indexes added to summaries after its table was first created
+    existing = {index["name"] for index in inspect(engine).get_indexes("summaries")}
+    for index in SummaryDB.__table__.indexes:
+        if index.name in existing:
+            continue
+        if index.unique:
+            with engine.begin() as connection:
+                removed = remove_duplicate_summaries(connection)
+            if removed:
+                print(f"⚠️ Removed {removed} duplicate summaries before adding {index.name}")
+        # Raises if it still cannot be built: bulk_save_summaries relies on it
+        index.create(bind=engine)
+
+
+def remove_duplicate_summaries(connection) -> int:
+    """
+    Keep the oldest (lowest id) summary of each news item and delete the rest
+    X posts of a deleted summary are pointed at the kept one
+    
+    Returns:
+        Number of summaries deleted
+    """
+    kept = select(func.min(SummaryDB.id).label("id"), SummaryDB.news_item_id)\
+        .where(SummaryDB.news_item_id.is_not(None))\
+        .group_by(SummaryDB.news_item_id)\
+        .subquery()
+    duplicates = connection.execute(
+        select(SummaryDB.id, kept.c.id)
+        .join(kept, kept.c.news_item_id == SummaryDB.news_item_id)
+        .where(SummaryDB.id != kept.c.id)
+    ).all()
+    for duplicate_id, kept_id in duplicates:
+        connection.execute(
+            XPostDB.__table__.update().where(XPostDB.summary_id == duplicate_id).values(summary_id=kept_id)
+        )
+    if duplicates:
+        connection.execute(
+            SummaryDB.__table__.delete().where(SummaryDB.id.in_([duplicate_id for duplicate_id, _ in duplicates]))
+        )
+    return len(duplicates)
 
 
 # Database helper functions
@@ -129,28 +325,172 @@ def save_news_item(db: Session, item: dict) -> Optional[NewsItemDB]:
     Save a news item to database
     Skips if URL already exists
     """
+    from url_index import get_url_index
+    url_index = get_url_index()
     try:
-        # Check if item already exists
-        existing = get_news_item_by_url(db, item.get("url", ""))
-        if existing:
-            return existing
+        # Only look the row up when the URL index cannot rule it out
+        if not url_index.warmed or item.get("url", "") in url_index:
+            existing = get_news_item_by_url(db, item.get("url", ""))
+            if existing:
+                return existing
+        
+        # Embeddings and MinHash signatures are stored outside the news_items row
+        item = dict(item)
+        embedding = item.pop("embedding", None)
+        minhash = item.pop("minhash", None)
         
         db_item = NewsItemDB(**item)
         db.add(db_item)
         db.commit()
         db.refresh(db_item)
+        url_index.add(db_item.url)
+        
+        if embedding:
+            from embedding_store import store_embedding
+            from ann_index import index_news_item
+            vector = store_embedding(db_item.id, embedding)
+            # Keep the dedupe nearest-neighbour index in step with the table
+            index_news_item(db_item.id, vector)
+        if minhash is not None:
+            from near_dup import store_signature
+            store_signature(db, db_item.id, minhash)
         return db_item
+    except IntegrityError:
+        # Stored by another process since the index was warmed
+        db.rollback()
+        url_index.add(item.get("url", ""))
+        return get_news_item_by_url(db, item.get("url", ""))
     except Exception as e:
         db.rollback()
         print(f"Error saving news item: {e}")
         return None
 
 
+def insert_ignoring_conflicts(model, key: str):
+    """INSERT ... ON CONFLICT (key) DO NOTHING for the configured database"""
+    if engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model).on_conflict_do_nothing(index_elements=[key])
+
+
+def bulk_save_news_items(db: Session, items: List[dict]) -> Tuple[List[int], int]:
+    """
+    Save news items in one transaction, skipping URLs already stored
+    
+    Embeddings, MinHash signatures and the URL index are updated for the
+    inserted rows, as save_news_item does. If the batch fails, the items
+    are saved one at a time so one bad row only loses itself.
+    
+    Returns:
+        Ids of the items in input order (existing ids for skipped and
+        repeated URLs), and the number of rows actually inserted
+    """
+    from url_index import get_url_index
+    
+    rows = []
+    extras = {}
+    now = datetime.utcnow()
+    for item in items:
+        row = {column.name: item.get(column.name) for column in NewsItemDB.__table__.columns if column.name != "id"}
+        # Embeddings and MinHash signatures are stored outside the news_items row
+        row["embedding"] = None
+        row["scraped_date"] = row["scraped_date"] or now
+        row["is_duplicate"] = bool(row["is_duplicate"])
+        rows.append(row)
+        extras.setdefault(row["url"], (item.get("embedding"), item.get("minhash")))
+    if not rows:
+        return [], 0
+    
+    try:
+        statement = insert_ignoring_conflicts(NewsItemDB, "url").returning(NewsItemDB.id, NewsItemDB.url)
+        inserted = {url: row_id for row_id, url in db.execute(statement, rows)}
+        
+        skipped = list({row["url"] for row in rows if row["url"] not in inserted})
+        existing = dict(
+            db.query(NewsItemDB.url, NewsItemDB.id).filter(NewsItemDB.url.in_(skipped)).all()
+        ) if skipped else {}
+        
+        from near_dup import signature_rows
+        for url, row_id in inserted.items():
+            minhash = extras[url][1]
+            if minhash is not None:
+                db.add_all(signature_rows(row_id, minhash))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Error bulk saving news items, saving one at a time: {e}")
+        return save_each(db, items, "url", NewsItemDB.url, save_news_item)
+    
+    url_index = get_url_index()
+    for row in rows:
+        url_index.add(row["url"])
+    
+    embedded = [(row_id, extras[url][0]) for url, row_id in inserted.items() if extras[url][0]]
+    if embedded:
+        from embedding_store import store_embeddings
+        from ann_index import index_news_items
+        ids = [row_id for row_id, _ in embedded]
+        vectors = store_embeddings(ids, [embedding for _, embedding in embedded])
+        # Keep the dedupe nearest-neighbour index in step with the table
+        index_news_items(ids, vectors)
+    
+    ids = {**existing, **inserted}
+    return [ids[row["url"]] for row in rows if row["url"] in ids], len(inserted)
+
+
+def save_each(db: Session, records: List[dict], key: str, column, save) -> Tuple[List[int], int]:
+    """
+    Per-row fallback for the bulk savers: save records one at a time
+    
+    Returns:
+        Ids of the records saved, in input order, and how many were new
+    """
+    values = list({record.get(key) for record in records})
+    known = {value for (value,) in db.query(column).filter(column.in_(values)).all()}
+    ids = []
+    inserted = 0
+    for record in records:
+        saved = save(db, record)
+        if saved is None:
+            continue
+        ids.append(saved.id)
+        if record.get(key) not in known:
+            known.add(record.get(key))
+            inserted += 1
+    return ids, inserted
+
+
 def get_news_items(db: Session, skip: int = 0, limit: int = 100) -> List[NewsItemDB]:
     """Get news items from database"""
     return db.query(NewsItemDB).offset(skip).limit(limit).all()
 
 
+def get_unsummarized_news_items(db: Session, after_id: int = 0, limit: int = 100) -> List[NewsItemDB]:
+    """
+    Get news items that have no summary yet, in id order
+    Anti-join on summaries; page with after_id = id of the last item returned
+    """
+    return db.query(NewsItemDB)\
+        .outerjoin(SummaryDB, SummaryDB.news_item_id == NewsItemDB.id)\
+        .filter(NewsItemDB.id > after_id, SummaryDB.id.is_(None))\
+        .order_by(NewsItemDB.id)\
+        .limit(limit)\
+        .all()
+
+
+def get_news_items_page(db: Session, before_id: Optional[int] = None, limit: int = 100) -> List[NewsItemDB]:
+    """
+    Get news items newest first, one keyset page at a time
+    Pass before_id = id of the last item of the previous page
+    """
+    query = db.query(NewsItemDB)
+    if before_id is not None:
+        query = query.filter(NewsItemDB.id < before_id)
+    return query.order_by(NewsItemDB.id.desc()).limit(limit).all()
+
+
 def get_news_item_by_url(db: Session, url: str) -> Optional[NewsItemDB]:
     """Get news item by URL"""
     return db.query(NewsItemDB).filter(NewsItemDB.url == url).first()
@@ -181,25 +521,165 @@ def save_summary(db: Session, summary: dict) -> Optional[SummaryDB]:
         return None
 
 
+def bulk_save_summaries(db: Session, summaries: List[dict]) -> Tuple[List[int], int]:
+    """
+    Save summaries in one transaction, skipping news items already summarized
+    If the batch fails, the summaries are saved one at a time
+    
+    Returns:
+        Ids of the summaries in input order (existing ids for skipped
+        items), and the number of rows actually inserted
+    """
+    now = datetime.utcnow()
+    rows = [
+        {
+            "news_item_id": summary.get("news_item_id"),
+            "three_sentence_summary": summary.get("three_sentence_summary"),
+            "social_hook": summary.get("social_hook"),
+            "tags": summary.get("tags"),
+            "created_date": summary.get("created_date") or now
+        }
+        for summary in summaries
+    ]
+    if not rows:
+        return [], 0
+    
+    try:
+        statement = insert_ignoring_conflicts(SummaryDB, "news_item_id").returning(SummaryDB.id, SummaryDB.news_item_id)
+        ids = {news_item_id: row_id for row_id, news_item_id in db.execute(statement, rows)}
+        inserted = len(ids)
+        
+        skipped = list({row["news_item_id"] for row in rows if row["news_item_id"] not in ids})
+        if skipped:
+            ids.update({
+                news_item_id: row_id for news_item_id, row_id in
+                db.query(SummaryDB.news_item_id, SummaryDB.id).filter(SummaryDB.news_item_id.in_(skipped)).all()
+            })
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Error bulk saving summaries, saving one at a time: {e}")
+        return save_each(db, summaries, "news_item_id", SummaryDB.news_item_id, save_summary)
+    
+    return [ids[row["news_item_id"]] for row in rows if row["news_item_id"] in ids], inserted
+
+
+# Summary and subscriber reads are built as select() statements, so the
+# sync helpers here and the async ones in db_async run the same SQL
+
+def summaries_statement(skip: int = 0, limit: int = 100):
+    return select(SummaryDB)\
+        .order_by(SummaryDB.created_date.desc(), SummaryDB.id.desc())\
+        .offset(skip)\
+        .limit(limit)
+
+
+def summaries_page_statement(after: Optional[tuple] = None, limit: int = 100):
+    statement = select(SummaryDB)
+    if after is not None:
+        statement = statement.where(tuple_(SummaryDB.created_date, SummaryDB.id) < tuple_(*after))
+    return statement.order_by(SummaryDB.created_date.desc(), SummaryDB.id.desc()).limit(limit)
+
+
 def get_summaries(db: Session, skip: int = 0, limit: int = 100) -> List[SummaryDB]:
     """
     Get all summaries with pagination, newest first
+    OFFSET pagination; prefer get_summaries_page for deep pages
     """
-    return db.query(SummaryDB)\
-        .order_by(SummaryDB.created_date.desc())\
-        .offset(skip)\
-        .limit(limit)\
-        .all()
+    return db.scalars(summaries_statement(skip, limit)).all()
 
 
-def get_summaries_by_date(db: Session, date: datetime) -> List[SummaryDB]:
-    """Get summaries created on a specific date"""
+def get_summaries_page(db: Session, after: Optional[tuple] = None, limit: int = 100) -> List[SummaryDB]:
+    """
+    Get summaries newest first, one keyset page at a time
+    
+    Args:
+        after: (created_date, id) of the last summary of the previous page;
+            the next page starts right after it at any depth
+        limit: Page size
+    """
+    return db.scalars(summaries_page_statement(after, limit)).all()
+
+
+def created_between(query, start: Optional[datetime] = None, end: Optional[datetime] = None):
+    """Restrict a summaries query or select() to start <= created_date <= end (open bounds when None)"""
+    if start is not None:
+        query = query.filter(SummaryDB.created_date >= start)
+    if end is not None:
+        query = query.filter(SummaryDB.created_date <= end)
+    return query
+
+
+def get_summaries_in_range(db: Session, start: datetime, end: datetime, limit: Optional[int] = None) -> List[SummaryDB]:
+    """Get summaries created between start and end, newest first"""
+    query = created_between(db.query(SummaryDB), start, end)\
+        .order_by(SummaryDB.created_date.desc(), SummaryDB.id.desc())
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
+
+
+def day_bounds(date: datetime):
+    """First and last instant of the day containing date"""
     start = date.replace(hour=0, minute=0, second=0, microsecond=0)
     end = date.replace(hour=23, minute=59, second=59, microsecond=999999)
-    return db.query(SummaryDB).filter(
-        SummaryDB.created_date >= start,
-        SummaryDB.created_date <= end
-    ).all()
+    return start, end
+
+
+def summaries_by_date_statement(date: datetime):
+    return created_between(select(SummaryDB), *day_bounds(date))
+
+
+def get_summaries_by_date(db: Session, date: datetime) -> List[SummaryDB]:
+    """Get summaries created on a specific date"""
+    return db.scalars(summaries_by_date_statement(date)).all()
+
+
+def enrich_summary(summary: SummaryDB) -> dict:
+    """Summary fields plus the title, url and source of its news item"""
+    news_item = summary.news_item
+    return {
+        "id": summary.id,
+        "news_item_id": summary.news_item_id,
+        "title": news_item.title if news_item else "Untitled",
+        "url": news_item.url if news_item else None,
+        "source": news_item.source if news_item else None,
+        "three_sentence_summary": summary.three_sentence_summary,
+        "social_hook": summary.social_hook,
+        "tags": summary.tags,
+        "created_date": summary.created_date
+    }
+
+
+def enriched_summaries_statement(date: Optional[datetime] = None, limit: Optional[int] = None,
+                                 start: Optional[datetime] = None, end: Optional[datetime] = None):
+    statement = select(SummaryDB).options(joinedload(SummaryDB.news_item))
+    if date is not None:
+        statement = created_between(statement, *day_bounds(date)).order_by(SummaryDB.id)
+    else:
+        statement = created_between(statement, start, end).order_by(SummaryDB.created_date.desc(), SummaryDB.id.desc())
+    if limit is not None:
+        statement = statement.limit(limit)
+    return statement
+
+
+def count_summaries_statement(start: datetime, end: datetime):
+    return created_between(select(func.count(SummaryDB.id)), start, end)
+
+
+def get_enriched_summaries(db: Session, date: Optional[datetime] = None, limit: Optional[int] = None,
+                           start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[dict]:
+    """
+    Get summaries joined to their news items in one query, as dicts (see enrich_summary)
+    
+    Args:
+        date: Only summaries created on this day, in insertion order;
+            otherwise the newest summaries first
+        limit: Max number of summaries
+        start, end: Only summaries created in this range (when no date is given)
+    """
+    summaries = db.scalars(enriched_summaries_statement(date, limit, start, end)).all()
+    return [enrich_summary(summary) for summary in summaries]
 
 
 def save_daily_report(db: Session, report: dict) -> DailyReportDB:
@@ -268,11 +748,13 @@ def save_subscriber(db: Session, email: str) -> Optional[EmailSubscriberDB]:
         return None
 
 
+def active_subscribers_statement():
+    return select(EmailSubscriberDB).where(EmailSubscriberDB.active == True)
+
+
 def get_active_subscribers(db: Session) -> List[EmailSubscriberDB]:
     """Get all active email subscribers"""
-    return db.query(EmailSubscriberDB).filter(
-        EmailSubscriberDB.active == True
-    ).all()
+    return db.scalars(active_subscribers_statement()).all()
 
 
 def unsubscribe_email(db: Session, email: str) -> bool:
@@ -309,3 +791,230 @@ def update_subscriber_last_sent(db: Session, email: str) -> bool:
         db.rollback()
         print(f"Error updating last_sent: {e}")
         return False
+
+
+def get_http_cache_entry(db: Session, url: str) -> Optional[HttpCacheDB]:
+    """Get cached HTTP validators for a URL"""
+    return db.query(HttpCacheDB).filter(HttpCacheDB.url == url).first()
+
+
+def save_http_validators(db: Session, url: str, source: str, etag: Optional[str],
+                         last_modified: Optional[str], content_length: int) -> Optional[HttpCacheDB]:
+    """
+    Store the validators of a full (200) response for a URL
+    Creates the cache entry if it does not exist yet
+    """
+    try:
+        entry = get_http_cache_entry(db, url)
+        if not entry:
+            entry = HttpCacheDB(url=url, source=source, not_modified_count=0,
+                                bytes_saved=0, parse_time_saved=0.0)
+            db.add(entry)
+        
+        entry.source = source
+        entry.etag = etag
+        entry.last_modified = last_modified
+        entry.content_length = content_length
+        entry.last_checked = datetime.utcnow()
+        db.commit()
+        db.refresh(entry)
+        return entry
+    except Exception as e:
+        db.rollback()
+        print(f"Error saving HTTP validators: {e}")
+        return None
+
+
+def record_http_not_modified(db: Session, url: str) -> bool:
+    """Credit a 304 response with the bytes and parse time it avoided"""
+    try:
+        entry = get_http_cache_entry(db, url)
+        if not entry:
+            return False
+        
+        entry.not_modified_count = (entry.not_modified_count or 0) + 1
+        entry.bytes_saved = (entry.bytes_saved or 0) + (entry.content_length or 0)
+        entry.parse_time_saved = (entry.parse_time_saved or 0.0) + (entry.parse_time or 0.0)
+        entry.last_checked = datetime.utcnow()
+        db.commit()
+        return True
+    except Exception as e:
+        db.rollback()
+        print(f"Error recording 304 response: {e}")
+        return False
+
+
+def record_http_parse_time(db: Session, url: str, parse_time: float) -> bool:
+    """Store how long the last full download of a URL took to parse"""
+    try:
+        entry = get_http_cache_entry(db, url)
+        if not entry:
+            return False
+        
+        entry.parse_time = parse_time
+        db.commit()
+        return True
+    except Exception as e:
+        db.rollback()
+        print(f"Error recording parse time: {e}")
+        return False
+
+
+def get_http_cache_stats(db: Session) -> dict:
+    """Get conditional GET savings aggregated per source"""
+    rows = db.query(
+        HttpCacheDB.source,
+        func.count(HttpCacheDB.id),
+        func.sum(HttpCacheDB.not_modified_count),
+        func.sum(HttpCacheDB.bytes_saved),
+        func.sum(HttpCacheDB.parse_time_saved)
+    ).group_by(HttpCacheDB.source).all()
+    
+    return {
+        source: {
+            "urls": urls,
+            "not_modified": int(not_modified or 0),
+            "bytes_saved": int(bytes_saved or 0),
+            "parse_time_saved": round(float(parse_time_saved or 0.0), 3)
+        }
+        for source, urls, not_modified, bytes_saved, parse_time_saved in rows
+    }
+
+
+def get_cached_summaries(db: Session, keys: List[str], ttl: timedelta) -> Dict[str, dict]:
+    """
+    Get the cached summaries younger than ttl for any of the keys, marking them as used
+    One IN query and one update however many keys are looked up
+    
+    Returns:
+        Summaries by key (keys with no live entry are left out)
+    """
+    if not keys:
+        return {}
+    try:
+        found = dict(db.query(SummaryCacheDB.key, SummaryCacheDB.summary).filter(
+            SummaryCacheDB.key.in_(set(keys)),
+            SummaryCacheDB.created_at >= datetime.utcnow() - ttl
+        ).all())
+        if found:
+            db.query(SummaryCacheDB)\
+                .filter(SummaryCacheDB.key.in_(list(found)))\
+                .update({
+                    SummaryCacheDB.hits: func.coalesce(SummaryCacheDB.hits, 0) + 1,
+                    SummaryCacheDB.last_used: datetime.utcnow()
+                }, synchronize_session=False)
+            db.commit()
+        return {key: dict(summary) for key, summary in found.items()}
+    except Exception as e:
+        db.rollback()
+        print(f"Error reading summary cache: {e}")
+        return {}
+
+
+def save_cached_summaries(db: Session, model: str, prompt_version: str, summaries: Dict[str, dict]) -> None:
+    """Store (or replace) cached summaries, by key, in one transaction"""
+    try:
+        now = datetime.utcnow()
+        for key, summary in summaries.items():
+            db.merge(SummaryCacheDB(
+                key=key,
+                model=model,
+                prompt_version=prompt_version,
+                summary=summary,
+                hits=0,
+                created_at=now,
+                last_used=now
+            ))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Error saving summary cache entries: {e}")
+
+
+def evict_summary_cache(db: Session, ttl: timedelta, max_entries: int) -> int:
+    """
+    Delete expired entries, then the least recently used ones above max_entries
+    
+    Returns:
+        Number of entries deleted
+    """
+    try:
+        deleted = db.query(SummaryCacheDB)\
+            .filter(SummaryCacheDB.created_at < datetime.utcnow() - ttl)\
+            .delete(synchronize_session=False)
+        
+        excess = db.query(func.count(SummaryCacheDB.key)).scalar() - max_entries
+        if excess > 0:
+            oldest = db.query(SummaryCacheDB.key)\
+                .order_by(SummaryCacheDB.last_used)\
+                .limit(excess)\
+                .subquery()
+            deleted += db.query(SummaryCacheDB)\
+                .filter(SummaryCacheDB.key.in_(oldest.select()))\
+                .delete(synchronize_session=False)
+        
+        db.commit()
+        return deleted
+    except Exception as e:
+        db.rollback()
+        print(f"Error evicting summary cache: {e}")
+        return 0
+
+
+def count_cached_summaries(db: Session) -> int:
+    """Number of entries in the summary cache"""
+    return db.query(func.count(SummaryCacheDB.key)).scalar()
+
+
+def create_agent_run(db: Session, run_id: str, params: dict) -> Optional[AgentRunDB]:
+    """Record the start of an agent run"""
+    try:
+        run = AgentRunDB(id=run_id, status="running", params=params)
+        db.add(run)
+        db.commit()
+        db.refresh(run)
+        return run
+    except Exception as e:
+        db.rollback()
+        print(f"Error creating agent run: {e}")
+        return None
+
+
+def update_agent_run(db: Session, run_id: str, **fields) -> None:
+    """Update status, last_node, error, ... of an agent run"""
+    try:
+        db.query(AgentRunDB).filter(AgentRunDB.id == run_id).update(fields, synchronize_session=False)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Error updating agent run: {e}")
+
+
+def get_agent_run(db: Session, run_id: str) -> Optional[AgentRunDB]:
+    """Get an agent run by id"""
+    return db.query(AgentRunDB).filter(AgentRunDB.id == run_id).first()
+
+
+def get_agent_runs(db: Session, limit: int = 20) -> List[AgentRunDB]:
+    """Get the most recent agent runs"""
+    return db.query(AgentRunDB).order_by(AgentRunDB.started_at.desc()).limit(limit).all()
+
+
+def save_node_metric(db: Session, metric: dict) -> Optional[NodeMetricDB]:
+    """Save the metrics of one traced node"""
+    try:
+        db_metric = NodeMetricDB(**metric)
+        db.add(db_metric)
+        db.commit()
+        return db_metric
+    except Exception as e:
+        db.rollback()
+        print(f"Error saving node metric: {e}")
+        return None
+
+
+def get_node_metrics(db: Session, run_id: str) -> List[NodeMetricDB]:
+    """Get the node metrics of a run, in execution order"""
+    return db.query(NodeMetricDB).filter(NodeMetricDB.run_id == run_id).order_by(
+        NodeMetricDB.started_at, NodeMetricDB.id
+    ).all()
@@ -0,0 +1,97 @@
+"""
+Async database access for FastAPI handlers
+An aiosqlite (or asyncpg) engine over the same database as db.py, so read
+endpoints await their queries instead of blocking the event loop; the
+sync engine stays in place for the scheduler, the agent and scripts
+"""
+import os
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import event
+
+from db import (
+    DATABASE_URL, DB_PROFILE, SummaryDB, EmailSubscriberDB,
+    engine_options, is_file_sqlite, apply_sqlite_pragmas, enrich_summary,
+    summaries_statement, summaries_page_statement, summaries_by_date_statement,
+    enriched_summaries_statement, count_summaries_statement, active_subscribers_statement
+)
+
+# Async drivers for the sync URL schemes; ASYNC_DATABASE_URL overrides the mapping
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",  # Optional: pip install asyncpg
+    "postgres": "postgresql+asyncpg",
+}
+
+
+def async_database_url(url: str) -> str:
+    """The async-driver form of a sync database URL"""
+    scheme, _, rest = url.partition("://")
+    driver = ASYNC_DRIVERS.get(scheme.split("+")[0])
+    return f"{driver}://{rest}" if driver else url
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or async_database_url(DATABASE_URL)
+
+_engine = None
+_sessionmaker = None
+
+
+def get_async_engine():
+    """Create the async engine on first use (the async drivers are only needed then)"""
+    global _engine, _sessionmaker
+    if _engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+        _engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL))
+        if DB_PROFILE == "production" and is_file_sqlite(ASYNC_DATABASE_URL):
+            event.listen(_engine.sync_engine, "connect", apply_sqlite_pragmas)
+        _sessionmaker = async_sessionmaker(_engine, autoflush=False, expire_on_commit=False)
+    return _engine
+
+
+async def get_async_db():
+    """Get async database session"""
+    get_async_engine()
+    async with _sessionmaker() as db:
+        yield db
+
+
+async def dispose_async_engine() -> None:
+    """Close the async engine's pooled connections"""
+    if _engine is not None:
+        await _engine.dispose()
+
+
+# Async versions of the db.py read helpers (same statements)
+
+async def get_summaries(db, skip: int = 0, limit: int = 100) -> List[SummaryDB]:
+    """Get all summaries with OFFSET pagination, newest first"""
+    return (await db.scalars(summaries_statement(skip, limit))).all()
+
+
+async def get_summaries_page(db, after: Optional[tuple] = None, limit: int = 100) -> List[SummaryDB]:
+    """Get summaries newest first, one keyset page at a time (see db.get_summaries_page)"""
+    return (await db.scalars(summaries_page_statement(after, limit))).all()
+
+
+async def get_summaries_by_date(db, date: datetime) -> List[SummaryDB]:
+    """Get summaries created on a specific date"""
+    return (await db.scalars(summaries_by_date_statement(date))).all()
+
+
+async def get_enriched_summaries(db, date: Optional[datetime] = None, limit: Optional[int] = None,
+                                 start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[dict]:
+    """Get summaries joined to their news items in one query, as dicts (see db.get_enriched_summaries)"""
+    summaries = (await db.scalars(enriched_summaries_statement(date, limit, start, end))).all()
+    return [enrich_summary(summary) for summary in summaries]
+
+
+async def count_summaries(db, start: datetime, end: datetime) -> int:
+    """Number of summaries created between start and end"""
+    return await db.scalar(count_summaries_statement(start, end))
+
+
+async def get_active_subscribers(db) -> List[EmailSubscriberDB]:
+    """Get all active email subscribers"""
+    return (await db.scalars(active_subscribers_statement())).all()
@@ -0,0 +1,119 @@
+"""
+Lock-contention benchmark for the SQLite storage profiles
+Writer threads insert news items one commit at a time (as the scheduler
+and /fetch do) while reader threads page through summaries (as the API
+does), once per profile on a fresh database file
+
+Usage: python db_benchmark.py [seconds] [writers] [readers]
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+import threading
+from typing import Dict, List
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from db import Base, NewsItemDB, SummaryDB, create_db_engine, get_summaries_page
+
+PROFILES = ("default", "production")
+SEED_ROWS = 2000
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run_profile(profile: str, seconds: float, writers: int, readers: int) -> Dict:
+    """Run the mixed workload against a new database with the given profile"""
+    directory = tempfile.mkdtemp(prefix="pulse_bench_")
+    path = os.path.join(directory, "bench.db")
+    engine = create_db_engine(f"sqlite:///{path}", profile)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    db = Session()
+    db.bulk_insert_mappings(NewsItemDB, [
+        {"title": f"seed {i}", "url": f"https://seed.example/{i}", "source": "bench"}
+        for i in range(SEED_ROWS)
+    ])
+    db.bulk_insert_mappings(SummaryDB, [
+        {"news_item_id": i + 1, "three_sentence_summary": "s", "social_hook": "h", "tags": []}
+        for i in range(SEED_ROWS)
+    ])
+    db.commit()
+    db.close()
+
+    lock = threading.Lock()
+    results = {"write": [], "read": [], "locked": 0}
+    deadline = time.perf_counter() + seconds
+
+    def record(kind: str, elapsed: float) -> None:
+        with lock:
+            results[kind].append(elapsed)
+
+    def writer(worker: int) -> None:
+        session = Session()
+        count = 0
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                session.add(NewsItemDB(title="bench", url=f"https://bench.example/{worker}/{count}", source="bench"))
+                session.commit()
+                record("write", time.perf_counter() - start)
+            except OperationalError:
+                session.rollback()
+                with lock:
+                    results["locked"] += 1
+            count += 1
+        session.close()
+
+    def reader() -> None:
+        session = Session()
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                get_summaries_page(session, limit=50)
+                session.rollback()  # End the read transaction, as a request does
+                record("read", time.perf_counter() - start)
+            except OperationalError:
+                session.rollback()
+                with lock:
+                    results["locked"] += 1
+        session.close()
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    threads += [threading.Thread(target=reader) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+    shutil.rmtree(directory, ignore_errors=True)
+
+    return {
+        "profile": profile,
+        "writes_per_s": len(results["write"]) / seconds,
+        "reads_per_s": len(results["read"]) / seconds,
+        "write_p95_ms": percentile(results["write"], 0.95) * 1000,
+        "read_p95_ms": percentile(results["read"], 0.95) * 1000,
+        "locked": results["locked"]
+    }
+
+
+if __name__ == "__main__":
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    writers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    readers = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+
+    print(f"{writers} writers, {readers} readers, {seconds:g}s per profile")
+    print(f"{'profile':>11} {'writes/s':>9} {'reads/s':>9} {'write p95':>10} {'read p95':>9} {'locked':>7}")
+    for profile in PROFILES:
+        row = run_profile(profile, seconds, writers, readers)
+        print(f"{row['profile']:>11} {row['writes_per_s']:>9.0f} {row['reads_per_s']:>9.0f} "
+              f"{row['write_p95_ms']:>8.1f}ms {row['read_p95_ms']:>7.1f}ms {row['locked']:>7}")
@@ -1,22 +1,29 @@
 """
 Deduplication and novelty scoring using simple text similarity
+Similarities are computed with NumPy over a contiguous float32 embedding matrix
 """
 import os
 import hashlib
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Iterable
+import numpy as np
 
 
 USE_MOCK_MODE = os.getenv("USE_MOCK_MODE", "True").lower() == "true"
 
+EMBEDDING_DIM = 16  # Length of the vectors produced by generate_embedding
+DUPLICATE_THRESHOLD = 0.85
+# "embedding", "minhash" or "hybrid" (see deduplicate_items)
+DEDUPE_METHOD = os.getenv("DEDUPE_METHOD", "embedding").lower()
+
 
 def generate_embedding(text: str) -> List[float]:
     """
     Generate a simple hash-based embedding for a text
     (Simplified version without sentence-transformers)
-    
+
     Args:
         text: Text to embed
-        
+
     Returns:
         Hash-based embedding vector
     """
@@ -29,130 +36,395 @@ def generate_embedding(text: str) -> List[float]:
 def compute_similarity(embedding1: List[float], embedding2: List[float]) -> float:
     """
     Compute simple similarity between two embeddings
-    
+
     Args:
         embedding1: First embedding
         embedding2: Second embedding
-        
+
     Returns:
         Similarity score (0-1)
     """
     if not embedding1 or not embedding2:
         return 0.0
-    
+
     # Simple dot product similarity
     similarity = sum(a * b for a, b in zip(embedding1, embedding2)) / len(embedding1)
     return max(0.0, min(1.0, similarity))  # Clamp to [0, 1]
 
 
-def check_duplicate(new_item: Dict, existing_items: List[Dict], threshold: float = 0.85) -> Tuple[bool, float]:
+def to_vector(embedding: List[float], dim: int = EMBEDDING_DIM) -> np.ndarray:
+    """
+    Convert an embedding to a float32 vector of length `dim`
+    Shorter embeddings are zero-padded, which matches the zip() in compute_similarity
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    values = np.asarray(embedding[:dim], dtype=np.float32)
+    vector[:len(values)] = values
+    return vector
+
+
+class EmbeddingMatrix:
+    """
+    Growable, contiguous float32 matrix of embeddings (one row per item)
+
+    Rows live in an over-allocated buffer that doubles when full, so
+    appends are amortised O(1) instead of copying the whole matrix.
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM, capacity: int = 0):
+        self.dim = dim
+        self._buffer = np.zeros((max(capacity, 16), dim), dtype=np.float32)
+        self._size = 0
+
+    @classmethod
+    def from_items(cls, items: List[Dict], extra_capacity: int = 0, dim: int = EMBEDDING_DIM) -> "EmbeddingMatrix":
+        """
+        Build a matrix from items with an "embedding" key
+        Items without an embedding are skipped, as they never match anything
+        """
+        embeddings = [item.get("embedding") for item in items]
+        embeddings = [e for e in embeddings if e]
+        matrix = cls(dim=dim, capacity=len(embeddings) + extra_capacity)
+        matrix.extend(to_vector(e, dim) for e in embeddings)
+        return matrix
+
+    @classmethod
+    def from_array(cls, rows: np.ndarray, extra_capacity: int = 0) -> "EmbeddingMatrix":
+        """Build a matrix from an existing (rows x dim) array, e.g. a memory-mapped store"""
+        matrix = cls(dim=rows.shape[1], capacity=len(rows) + extra_capacity)
+        matrix._buffer[:len(rows)] = rows
+        matrix._size = len(rows)
+        return matrix
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def rows(self) -> np.ndarray:
+        """View of the filled rows (no copy)"""
+        return self._buffer[:self._size]
+
+    def reserve(self, capacity: int) -> None:
+        """Make sure the buffer can hold `capacity` rows without growing"""
+        if capacity <= len(self._buffer):
+            return
+        new_capacity = max(capacity, 2 * len(self._buffer))
+        buffer = np.zeros((new_capacity, self.dim), dtype=np.float32)
+        buffer[:self._size] = self.rows
+        self._buffer = buffer
+
+    def append(self, vector: np.ndarray) -> None:
+        """Append one row"""
+        self.reserve(self._size + 1)
+        self._buffer[self._size] = vector
+        self._size += 1
+
+    def extend(self, vectors: Iterable[np.ndarray]) -> None:
+        """Append several rows"""
+        vectors = list(vectors)
+        if not vectors:
+            return
+        self.reserve(self._size + len(vectors))
+        self._buffer[self._size:self._size + len(vectors)] = np.stack(vectors)
+        self._size += len(vectors)
+
+    def similarities(self, vectors: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+        """
+        Similarity of each query vector against every row, as one matrix product
+
+        Args:
+            vectors: Query matrix (batch x dim)
+            lengths: Original embedding length of each query (divisor in compute_similarity)
+
+        Returns:
+            Clamped similarity matrix (batch x rows)
+        """
+        scores = vectors @ self.rows.T / lengths[:, None]
+        return np.clip(scores, 0.0, 1.0)
+
+
+def _query(item: Dict) -> Tuple[np.ndarray, np.ndarray]:
+    """Build a 1-row query matrix and its length divisor for a single item"""
+    embedding = item.get("embedding", [])
+    return to_vector(embedding)[None, :], np.array([len(embedding)], dtype=np.float32)
+
+
+def check_duplicate(new_item: Dict, existing_items: List[Dict], threshold: float = DUPLICATE_THRESHOLD) -> Tuple[bool, float]:
     """
     Check if a news item is a duplicate of existing items
-    
+
     Args:
         new_item: New news item with embedding
         existing_items: List of existing items with embeddings
         threshold: Similarity threshold for duplicate detection
-        
+
     Returns:
         Tuple of (is_duplicate, max_similarity)
     """
-    if not existing_items:
+    if not existing_items or not new_item.get("embedding"):
         return False, 0.0
-    
-    new_embedding = new_item.get("embedding", [])
-    if not new_embedding:
+
+    matrix = EmbeddingMatrix.from_items(existing_items)
+    if not len(matrix):
         return False, 0.0
-    
-    max_similarity = 0.0
-    
-    for existing_item in existing_items:
-        existing_embedding = existing_item.get("embedding", [])
-        if not existing_embedding:
-            continue
-        
-        similarity = compute_similarity(new_embedding, existing_embedding)
-        max_similarity = max(max_similarity, similarity)
-        
-        if similarity >= threshold:
-            return True, similarity
-    
-    return False, max_similarity
+
+    similarities = matrix.similarities(*_query(new_item))[0]
+    hits = np.flatnonzero(similarities >= threshold)
+    if hits.size:
+        return True, float(similarities[hits[0]])
+
+    return False, float(similarities.max())
 
 
 def compute_novelty_score(item: Dict, existing_items: List[Dict]) -> float:
     """
     Compute novelty score for a news item
     Higher score = more novel/unique content
-    
+
     Args:
         item: News item with embedding
         existing_items: List of existing items with embeddings
-        
+
     Returns:
         Novelty score (0-1, where 1 is most novel)
     """
     if not existing_items:
         return 1.0  # First item is always novel
-    
-    item_embedding = item.get("embedding", [])
-    if not item_embedding:
+
+    if not item.get("embedding"):
         return 0.5  # Default middle score if no embedding
-    
-    similarities = []
-    for existing_item in existing_items:
-        existing_embedding = existing_item.get("embedding", [])
-        if existing_embedding:
-            similarity = compute_similarity(item_embedding, existing_embedding)
-            similarities.append(similarity)
-    
-    if not similarities:
+
+    matrix = EmbeddingMatrix.from_items(existing_items)
+    if not len(matrix):
         return 1.0
-    
+
     # Novelty is inverse of average similarity
-    avg_similarity = sum(similarities) / len(similarities)
-    novelty = 1.0 - avg_similarity
-    
-    return float(novelty)
+    similarities = matrix.similarities(*_query(item))[0]
+    return float(1.0 - similarities.mean(dtype=np.float64))
+
+
+def deduplicate_with_matrix(
+    items: List[Dict],
+    matrix: EmbeddingMatrix,
+    threshold: float = DUPLICATE_THRESHOLD
+) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Deduplicate items against an embedding matrix, appending the unique ones to it
 
+    Items are compared against the matrix rows first and then against the
+    unique items accepted earlier in the same batch, in that order, exactly
+    like the sequential scan in check_duplicate.
 
-def deduplicate_items(items: List[Dict], existing_items: List[Dict] = None) -> Tuple[List[Dict], List[Dict]]:
+    Args:
+        items: New items, each with an "embedding"
+        matrix: Embeddings of already accepted items (updated in place)
+        threshold: Similarity threshold for duplicate detection
+
+    Returns:
+        Tuple of (unique_items, duplicate_items)
+    """
+    unique_items = []
+    duplicate_items = []
+    if not items:
+        return unique_items, duplicate_items
+
+    vectors = np.stack([to_vector(item["embedding"], matrix.dim) for item in items])
+    lengths = np.array([len(item["embedding"]) for item in items], dtype=np.float32)
+
+    # One matrix product against the stored rows, one within the batch
+    vs_existing = matrix.similarities(vectors, lengths)
+    vs_batch = np.clip(vectors @ vectors.T / lengths[:, None], 0.0, 1.0)
+
+    accepted = []
+    for i, item in enumerate(items):
+        existing_row = vs_existing[i]
+        batch_row = vs_batch[i, accepted]
+
+        hits = np.flatnonzero(existing_row >= threshold)
+        if not hits.size:
+            hits = np.flatnonzero(batch_row >= threshold)
+            similarity = batch_row[hits[0]] if hits.size else None
+        else:
+            similarity = existing_row[hits[0]]
+
+        if similarity is not None:
+            item["is_duplicate"] = True
+            item["novelty_score"] = 1.0 - float(similarity)
+            duplicate_items.append(item)
+            continue
+
+        count = existing_row.size + batch_row.size
+        total = existing_row.sum(dtype=np.float64) + batch_row.sum(dtype=np.float64)
+        item["is_duplicate"] = False
+        item["novelty_score"] = float(1.0 - total / count) if count else 1.0
+        unique_items.append(item)
+        accepted.append(i)
+
+    matrix.extend(vectors[accepted])
+    return unique_items, duplicate_items
+
+
+def deduplicate_with_index(
+    items: List[Dict],
+    index,
+    threshold: float = DUPLICATE_THRESHOLD,
+    k: int = None
+) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Deduplicate items against a nearest-neighbour index of the archive
+
+    Only the top-k neighbours of each item are checked for duplicates. When
+    several exceed the threshold, the one with the lowest id is reported;
+    this is not necessarily the row deduplicate_with_matrix would report,
+    which takes the first match in matrix order and only sees the rows
+    loaded into the matrix, so the two can disagree on which item matched.
+    Novelty uses the index's running sum of vectors, which equals the
+    full-scan mean because hash embeddings never need clamping. The index
+    itself is not modified; rows are added as they are saved to the database.
+
+    Args:
+        items: New items, each with an "embedding"
+        index: Index with search(vector, k), sum_vector, top_k and len() (see ann_index)
+        threshold: Similarity threshold for duplicate detection
+        k: Number of neighbours to check per item (defaults to index.top_k)
+
+    Returns:
+        Tuple of (unique_items, duplicate_items)
+    """
+    unique_items = []
+    duplicate_items = []
+    if not items:
+        return unique_items, duplicate_items
+
+    vectors = np.stack([to_vector(item["embedding"], index.dim) for item in items])
+    lengths = np.array([len(item["embedding"]) for item in items], dtype=np.float32)
+    vs_batch = np.clip(vectors @ vectors.T / lengths[:, None], 0.0, 1.0)
+    archive_means = vectors.astype(np.float64) @ index.sum_vector / lengths
+
+    accepted = []
+    for i, item in enumerate(items):
+        batch_row = vs_batch[i, accepted]
+        similarity = None
+
+        ids, scores = index.search(vectors[i], k or index.top_k)
+        neighbour_sims = np.clip(scores / lengths[i], 0.0, 1.0)
+        hits = np.flatnonzero(neighbour_sims >= threshold)
+        if hits.size:
+            similarity = neighbour_sims[hits[np.argmin(ids[hits])]]
+        else:
+            hits = np.flatnonzero(batch_row >= threshold)
+            if hits.size:
+                similarity = batch_row[hits[0]]
+
+        if similarity is not None:
+            item["is_duplicate"] = True
+            item["novelty_score"] = 1.0 - float(similarity)
+            duplicate_items.append(item)
+            continue
+
+        count = len(index) + batch_row.size
+        total = archive_means[i] + batch_row.sum(dtype=np.float64)
+        item["is_duplicate"] = False
+        item["novelty_score"] = float(1.0 - total / count) if count else 1.0
+        unique_items.append(item)
+        accepted.append(i)
+
+    return unique_items, duplicate_items
+
+
+def deduplicate_items(
+    items: List[Dict],
+    existing_items: List[Dict] = None,
+    index=None,
+    existing_matrix: EmbeddingMatrix = None,
+    near_dup=None,
+    url_index=None,
+    method: str = DEDUPE_METHOD
+) -> Tuple[List[Dict], List[Dict]]:
     """
     Deduplicate a list of news items
-    
+
     Args:
         items: List of new items to process
         existing_items: List of existing items from database
-        
+        index: Optional nearest-neighbour index of the archive (see ann_index);
+            when given it is used instead of existing_items
+        existing_matrix: Optional prebuilt matrix of existing embeddings
+            (see embedding_store); used instead of existing_items, and
+            the unique items are appended to it
+        near_dup: Optional MinHashLSH holding the archive's LSH buckets
+            (see near_dup); without one only the batch itself is checked
+        url_index: Optional UrlIndex of stored canonical URLs (see url_index);
+            exact URL duplicates are dropped before any other stage, and
+            without one only the batch itself is checked
+        method: "embedding", "minhash" (near-duplicate stage only) or
+            "hybrid" (near-duplicate stage, then embeddings)
+
     Returns:
         Tuple of (unique_items, duplicate_items)
     """
     if existing_items is None:
         existing_items = []
-    
-    unique_items = []
-    duplicate_items = []
-    
+
+    # Exact canonical-URL duplicates are rejected before any embedding work
+    from url_index import UrlIndex
+    if url_index is None:
+        url_index = UrlIndex()
+    items, url_duplicates = url_index.filter(items)
+
     # Add embeddings to new items
     for item in items:
         if "embedding" not in item or not item["embedding"]:
             combined_text = f"{item.get('title', '')} {item.get('content', '')}"
             item["embedding"] = generate_embedding(combined_text)
-    
-    # Check each item for duplicates
-    all_processed = existing_items.copy()
-    
-    for item in items:
-        is_dup, similarity = check_duplicate(item, all_processed)
-        
-        if is_dup:
-            item["is_duplicate"] = True
-            item["novelty_score"] = 1.0 - similarity
-            duplicate_items.append(item)
-        else:
-            item["is_duplicate"] = False
-            item["novelty_score"] = compute_novelty_score(item, all_processed)
-            unique_items.append(item)
-            all_processed.append(item)
-    
+
+    near_duplicates = []
+    if method in ("minhash", "hybrid"):
+        from near_dup import MinHashLSH
+        items, near_duplicates = (near_dup or MinHashLSH()).filter(items)
+        if method == "minhash":
+            return items, url_duplicates + near_duplicates
+
+    if index is not None:
+        unique_items, duplicate_items = deduplicate_with_index(items, index)
+    elif existing_matrix is not None:
+        unique_items, duplicate_items = deduplicate_with_matrix(items, existing_matrix)
+    else:
+        # Room for every new item up front, so accepting uniques never regrows the buffer
+        matrix = EmbeddingMatrix.from_items(existing_items, extra_capacity=len(items))
+        unique_items, duplicate_items = deduplicate_with_matrix(items, matrix)
+
+    return unique_items, url_duplicates + near_duplicates + duplicate_items
+
+
+def deduplicate_against_archive(db, items: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Deduplicate scraped items against everything stored, for callers that save the unique ones
+
+    Uses the URL index, the archive's MinHash buckets and the nearest-neighbour
+    index if one is enabled, else the embeddings of the latest 1000 rows.
+
+    Args:
+        db: Database session
+        items: Scraped items
+
+    Returns:
+        Tuple of (unique_items, duplicate_items)
+    """
+    from ann_index import get_ann_index
+    from embedding_store import load_existing_embeddings
+    from near_dup import MinHashLSH
+    from url_index import get_url_index
+
+    url_index = get_url_index(db)
+    ann_index = get_ann_index()
+    if ann_index is not None:
+        print(f"  Checking against {ann_index.kind} index of {len(ann_index)} archived items")
+        unique_items, duplicate_items = deduplicate_items(items, index=ann_index, near_dup=MinHashLSH(db), url_index=url_index)
+    else:
+        existing = load_existing_embeddings(db, limit=1000, extra_capacity=len(items))
+        print(f"  Found {len(existing)} existing items in DB")
+        unique_items, duplicate_items = deduplicate_items(items, existing_matrix=existing, near_dup=MinHashLSH(db), url_index=url_index)
+    print(f"  After dedup: {len(unique_items)} unique, {len(duplicate_items)} duplicates "
+          f"(URL index hit rate {url_index.stats()['hit_rate']:.1%})")
     return unique_items, duplicate_items
@@ -0,0 +1,218 @@
+"""
+Persistent embedding store backed by memory-mapped float32 files
+Replaces the JSON `embedding` column so dedupe can map the matrix in
+without decoding one JSON array per row
+
+Layout (both files are append-only, fixed width):
+- <EMBEDDING_STORE_PATH>.f32: one float32 row of EMBEDDING_DIM values per item
+- <EMBEDDING_STORE_PATH>.ids: one int64 news item id per row (row offset = position)
+"""
+import os
+import sys
+import threading
+from typing import Dict, List, Optional
+import numpy as np
+from sqlalchemy import null
+
+from dedupe import EMBEDDING_DIM, EmbeddingMatrix, to_vector
+
+EMBEDDING_STORE_PATH = os.getenv("EMBEDDING_STORE_PATH", "./embeddings")
+
+
+class EmbeddingStore:
+    """
+    Append-only float32 matrix on disk with an id -> row offset index
+
+    Vectors are written before their ids, so after a crash the row count is
+    taken from the shorter of the two files and a half-written row is ignored.
+    """
+
+    def __init__(self, path: str = EMBEDDING_STORE_PATH, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+        self.vectors_path = path + ".f32"
+        self.ids_path = path + ".ids"
+        self._row_bytes = dim * np.dtype(np.float32).itemsize
+        self._lock = threading.Lock()
+        self._rows: Dict[int, int] = {}
+        self._ids = np.empty(0, dtype=np.int64)
+        self._matrix = np.empty((0, dim), dtype=np.float32)
+        self.refresh()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _row_count(self) -> int:
+        if not os.path.exists(self.vectors_path) or not os.path.exists(self.ids_path):
+            return 0
+        return min(os.path.getsize(self.vectors_path) // self._row_bytes,
+                   os.path.getsize(self.ids_path) // np.dtype(np.int64).itemsize)
+
+    def refresh(self) -> None:
+        """Re-map the files if another process or writer appended rows"""
+        count = self._row_count()
+        if count == len(self._ids):
+            return
+        if count == 0:
+            return
+
+        self._matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(count, self.dim))
+        ids = np.memmap(self.ids_path, dtype=np.int64, mode="r", shape=(count,))
+        for row in range(len(self._ids), count):
+            self._rows.setdefault(int(ids[row]), row)
+        self._ids = ids
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """Read-only memory-mapped view of all rows"""
+        return self._matrix
+
+    @property
+    def ids(self) -> np.ndarray:
+        """News item id of each row"""
+        return self._ids
+
+    @property
+    def max_id(self) -> int:
+        return int(self._ids.max()) if len(self._ids) else 0
+
+    def row_of(self, news_item_id: int) -> Optional[int]:
+        """Row offset of a news item, or None if it has no stored embedding"""
+        return self._rows.get(news_item_id)
+
+    def get(self, news_item_id: int) -> Optional[np.ndarray]:
+        """Embedding of a news item, or None"""
+        row = self.row_of(news_item_id)
+        return None if row is None else np.array(self._matrix[row])
+
+    def rows_for(self, news_item_ids: List[int]) -> np.ndarray:
+        """Embeddings of the given news items (items without one are skipped)"""
+        rows = [self._rows[i] for i in news_item_ids if i in self._rows]
+        return np.asarray(self._matrix[rows])
+
+    def append(self, news_item_ids: List[int], vectors: np.ndarray) -> int:
+        """
+        Append embeddings for news items not stored yet
+
+        Returns:
+            Number of rows written
+        """
+        with self._lock:
+            self.refresh()
+            new = [(i, v) for i, v in zip(news_item_ids, vectors) if int(i) not in self._rows]
+            if not new:
+                return 0
+
+            block = np.stack([v for _, v in new]).astype(np.float32)
+            with open(self.vectors_path, "ab") as f:
+                f.write(block.tobytes())
+            with open(self.ids_path, "ab") as f:
+                f.write(np.asarray([i for i, _ in new], dtype=np.int64).tobytes())
+
+            self.refresh()
+            return len(new)
+
+
+_store: Optional[EmbeddingStore] = None
+
+
+def get_embedding_store() -> EmbeddingStore:
+    """Get the process-wide embedding store, picking up rows appended elsewhere"""
+    global _store
+    if _store is None:
+        _store = EmbeddingStore()
+    else:
+        _store.refresh()
+    return _store
+
+
+def store_embedding(news_item_id: int, embedding: List[float]) -> np.ndarray:
+    """
+    Store the embedding of a newly saved news item
+
+    Returns:
+        The stored float32 vector
+    """
+    return store_embeddings([news_item_id], [embedding])[0]
+
+
+def store_embeddings(news_item_ids: List[int], embeddings: List[List[float]]) -> np.ndarray:
+    """
+    Store the embeddings of newly saved news items with one append
+
+    Returns:
+        The stored float32 vectors, one row per item
+    """
+    store = get_embedding_store()
+    vectors = np.stack([to_vector(embedding, store.dim) for embedding in embeddings])
+    store.append(news_item_ids, vectors)
+    return vectors
+
+
+def load_existing_embeddings(db, limit: int = 1000, extra_capacity: int = 0) -> EmbeddingMatrix:
+    """
+    Build the dedupe matrix for the same rows get_news_items(limit=...) returns
+    Only ids come from the database; vectors are copied from the mapped store
+    """
+    from db import NewsItemDB
+
+    ids = [row_id for (row_id,) in db.query(NewsItemDB.id).limit(limit).all()]
+    rows = get_embedding_store().rows_for(ids)
+    return EmbeddingMatrix.from_array(rows, extra_capacity=extra_capacity)
+
+
+def migrate_json_embeddings(db, clear_json: bool = False, batch_size: int = 1000) -> int:
+    """
+    Copy embeddings from the JSON column into the store
+
+    Safe to re-run: items already in the store are skipped. With clear_json
+    the JSON values are set to NULL once copied, so later runs are no-ops;
+    only do that as a one-off step, since the store file is then the only copy.
+
+    Returns:
+        Number of embeddings written to the store
+    """
+    from db import NewsItemDB
+
+    store = get_embedding_store()
+    migrated = 0
+    last_id = 0
+
+    while True:
+        rows = db.query(NewsItemDB.id, NewsItemDB.embedding)\
+            .filter(NewsItemDB.id > last_id, NewsItemDB.embedding.isnot(None))\
+            .order_by(NewsItemDB.id)\
+            .limit(batch_size)\
+            .all()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+
+        with_embeddings = [(row_id, embedding) for row_id, embedding in rows if embedding]
+        if with_embeddings:
+            migrated += store.append(
+                [row_id for row_id, _ in with_embeddings],
+                np.stack([to_vector(embedding, store.dim) for _, embedding in with_embeddings])
+            )
+
+        if clear_json:
+            db.query(NewsItemDB)\
+                .filter(NewsItemDB.id.in_([row_id for row_id, _ in rows]))\
+                .update({NewsItemDB.embedding: null()}, synchronize_session=False)
+            db.commit()
+
+    return migrated
+
+
+if __name__ == "__main__":
+    # Usage: python embedding_store.py [--keep-json]
+    # One-off migration: clears the JSON column unless --keep-json is given
+    from db import SessionLocal, init_db
+
+    init_db()
+    db = SessionLocal()
+    try:
+        count = migrate_json_embeddings(db, clear_json="--keep-json" not in sys.argv)
+        print(f"✅ Migrated {count} embeddings to {EMBEDDING_STORE_PATH}.f32 "
+              f"({len(get_embedding_store())} stored)")
+    finally:
+        db.close()
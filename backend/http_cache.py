@@ -0,0 +1,109 @@
+"""
+Conditional GET cache for scraped sources
+Stores ETag / Last-Modified validators per URL so unchanged pages come back
+as 304 Not Modified and skip downloading and parsing
+"""
+import asyncio
+from typing import Optional, Tuple
+import httpx
+
+from db import (
+    SessionLocal, get_http_cache_entry, save_http_validators,
+    record_http_not_modified, record_http_parse_time
+)
+
+
+def _load_validators(url: str) -> Tuple[Optional[str], Optional[str]]:
+    db = SessionLocal()
+    try:
+        entry = get_http_cache_entry(db, url)
+        return (entry.etag, entry.last_modified) if entry else (None, None)
+    finally:
+        db.close()
+
+
+def _record_not_modified(url: str) -> None:
+    db = SessionLocal()
+    try:
+        record_http_not_modified(db, url)
+    finally:
+        db.close()
+
+
+def _store_validators(url: str, source: str, response: httpx.Response, parse_time: float) -> None:
+    db = SessionLocal()
+    try:
+        if save_http_validators(
+            db, url, source,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            content_length=len(response.content)
+        ):
+            record_http_parse_time(db, url, parse_time)
+    finally:
+        db.close()
+
+
+async def conditional_get(client: httpx.AsyncClient, url: str, source: str,
+                          use_cache: bool = True, **kwargs) -> Optional[httpx.Response]:
+    """
+    GET a URL, sending the validators from the last successfully parsed download
+    
+    The cache database is read and written in a worker thread, and its
+    errors only disable the cache for this request.
+    
+    Args:
+        client: HTTP client to use
+        url: URL to fetch
+        source: Source name the savings are credited to
+        use_cache: Send the stored validators. Only callers that persist
+            what they parse should: a 304 means "nothing new since the
+            last stored scrape", not "nothing to report"
+        **kwargs: Extra arguments passed to client.get
+        
+    Returns:
+        The response, or None if the server answered 304 Not Modified
+    """
+    if not use_cache:
+        return await client.get(url, **kwargs)
+    
+    etag = last_modified = None
+    try:
+        etag, last_modified = await asyncio.to_thread(_load_validators, url)
+    except Exception as e:
+        print(f"  ⚠️  HTTP cache unavailable for {url}: {e}")
+    
+    headers = dict(kwargs.pop("headers", None) or {})
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    
+    response = await client.get(url, headers=headers, **kwargs)
+    
+    if response.status_code == 304:
+        try:
+            await asyncio.to_thread(_record_not_modified, url)
+        except Exception as e:
+            print(f"  ⚠️  Could not record 304 for {url}: {e}")
+        return None
+    
+    return response
+
+
+async def record_parsed(url: str, source: str, response: httpx.Response, parse_time: float,
+                        use_cache: bool = True) -> None:
+    """
+    Store the validators of a full download once it parsed successfully,
+    with its parse time (credited on later 304s)
+    
+    Called only after parsing, so a page whose parse failed is downloaded
+    again next time instead of coming back 304 and being skipped. Nothing
+    is stored without use_cache, as the caller does not persist the items.
+    """
+    if not use_cache or response.status_code != 200:
+        return
+    try:
+        await asyncio.to_thread(_store_validators, url, source, response, parse_time)
+    except Exception as e:
+        print(f"  ⚠️  Could not store HTTP validators for {url}: {e}")
@@ -7,6 +7,7 @@ import httpx
 import base64
 from typing import Optional
 from pathlib import Path
+from tracing import HTTP_EVENT_HOOKS
 
 
 class ImageGenerator:
@@ -55,7 +56,7 @@ class ImageGenerator:
             # Enhance prompt for better AI/ML themed images
             enhanced_prompt = f"{prompt}, digital art, high quality, detailed, trending on artstation, vibrant colors"
             
-            async with httpx.AsyncClient(timeout=60.0) as client:
+            async with httpx.AsyncClient(event_hooks=HTTP_EVENT_HOOKS, timeout=60.0) as client:
                 response = await client.post(
                     self.api_url,
                     headers={"Authorization": f"Bearer {self.api_token}"},
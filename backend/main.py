@@ -2,27 +2,34 @@
 FastAPI main application
 Exposes REST API endpoints for the Pulse AI Agent
 """
-from fastapi import FastAPI, HTTPException, Depends, Request
+from fastapi import FastAPI, HTTPException, Depends, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
-from typing import List
+from typing import List, Optional
 import os
+import json
+import base64
 
 from models import (
     ScrapeResponse, SummaryResponse, PublishResponse,
-    DailyReportResponse, WeeklyReportResponse, Summary, NewsItem
+    DailyReportResponse, WeeklyReportResponse, Summary, NewsItem, NewsResponse
 )
 from db import (
-    init_db, get_db, get_news_items, get_summaries,
-    get_summaries_by_date, save_news_item, save_summary,
-    NewsItemDB, SummaryDB, save_subscriber, get_active_subscribers, 
-    unsubscribe_email, update_subscriber_last_sent
+    init_db, get_db, get_news_items_page,
+    get_summaries_by_date, get_enriched_summaries, bulk_save_news_items,
+    save_subscriber, 
+    unsubscribe_email, update_subscriber_last_sent, get_http_cache_stats
 )
+import db_async
+from db_async import get_async_db
 from agent import run_agent
 from scraper import scrape_all_sources
-from dedupe import deduplicate_items
-from summaries import batch_summarize
+from dedupe import deduplicate_against_archive
+from ann_index import save_ann_index
+from url_index import get_url_index
+from summaries import summarize_backlog
 from tasks import generate_daily_report_content
 
 # Initialize FastAPI app
@@ -48,11 +55,30 @@ async def startup_event():
     init_db()
     print("✅ Database initialized")
     
+    # Copy legacy JSON embeddings into the embedding store; the JSON column is
+    # kept as the source of truth (clear it explicitly with python embedding_store.py)
+    from embedding_store import migrate_json_embeddings
+    from db import SessionLocal
+    db = SessionLocal()
+    try:
+        migrated = migrate_json_embeddings(db, clear_json=False)
+        if migrated:
+            print(f"✅ Migrated {migrated} embeddings to the embedding store")
+        print(f"✅ URL index warmed with {len(get_url_index(db))} canonical URLs")
+    finally:
+        db.close()
+    
     # Start cron scheduler for automated tasks
     from cron_jobs import start_scheduler
     start_scheduler()
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close pooled async database connections"""
+    await db_async.dispose_async_engine()
+
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -84,33 +110,13 @@ async def fetch_news(db: Session = Depends(get_db)):
         raw_items = await scrape_all_sources()
         print(f"  Scraped {len(raw_items)} total items")
         
-        # Get existing items from database
-        existing_items_db = get_news_items(db, limit=1000)
-        existing_items = [
-            {
-                "title": item.title,
-                "url": item.url,
-                "embedding": item.embedding if item.embedding else []
-            }
-            for item in existing_items_db
-        ]
-        print(f"  Found {len(existing_items)} existing items in DB")
-        
-        # Deduplicate
-        unique_items, duplicate_items = deduplicate_items(raw_items, existing_items)
-        print(f"  After dedup: {len(unique_items)} unique, {len(duplicate_items)} duplicates")
+        # Deduplicate against the stored archive
+        unique_items, duplicate_items = deduplicate_against_archive(db, raw_items)
         
-        # Save unique items to database
-        saved_count = 0
-        for item in unique_items:
-            try:
-                save_news_item(db, item)
-                saved_count += 1
-            except Exception as e:
-                print(f"  ⚠️  Error saving item '{item.get('title', 'Unknown')[:50]}': {e}")
-                continue
-        
-        print(f"  ✅ Saved {saved_count} items to database")
+        # Save unique items to database in one transaction
+        _, saved_count = bulk_save_news_items(db, unique_items)
+        print(f"  ✅ Saved {saved_count} new items to database")
+        save_ann_index()
         
         return ScrapeResponse(
             success=True,
@@ -127,17 +133,127 @@ async def fetch_news(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/stats/http-cache")
+async def http_cache_stats(db: Session = Depends(get_db)):
+    """
+    Get conditional GET savings per source
+    Bytes and parse time avoided thanks to 304 Not Modified responses
+    """
+    try:
+        return {"sources": get_http_cache_stats(db)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/stats/summaries")
+async def summary_stats():
+    """
+    Get LLM response parse stats
+    Share of paid summary calls whose output could not be parsed, 429s hit,
+    and prompt/completion tokens per summarized item
+    """
+    try:
+        from summaries import get_summary_stats
+        return get_summary_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/stats/summary-cache")
+async def summary_cache_stats():
+    """
+    Get LLM summary cache stats
+    Hits, misses and stores since startup, plus the current number of entries
+    """
+    try:
+        from summary_cache import get_cache_stats
+        return get_cache_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/stats/url-index")
+async def url_index_stats(db: Session = Depends(get_db)):
+    """
+    Get canonical URL index stats
+    Share of scraped items rejected as exact URL duplicates before similarity dedupe
+    """
+    try:
+        return get_url_index(db).stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def encode_cursor(*values) -> str:
+    """Opaque page cursor holding the sort key of the last row of a page"""
+    return base64.urlsafe_b64encode(json.dumps(values, default=str).encode()).decode()
+
+
+def cursor_id(value) -> int:
+    """Row id from a cursor; rejects anything but a JSON integer"""
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError(f"Not an id: {value!r}")
+    return value
+
+
+def decode_cursor(cursor: str, *types) -> list:
+    """
+    Values of a cursor made by encode_cursor, each converted by its type
+    (e.g. cursor_id, datetime.fromisoformat); 400 if it has another shape
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("Wrong number of cursor values")
+        return [convert(value) for convert, value in zip(types, values)]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@app.get("/news", response_model=NewsResponse)
+async def get_all_news(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
+    """
+    Get stored news items, newest first
+    Keyset pagination: pass next_cursor from the previous page as cursor
+    """
+    try:
+        before_id = decode_cursor(cursor, cursor_id)[0] if cursor else None
+        items_db = get_news_items_page(db, before_id=before_id, limit=limit)
+        
+        return NewsResponse(
+            news=[NewsItem.model_validate(item) for item in items_db],
+            total=len(items_db),
+            next_cursor=encode_cursor(items_db[-1].id) if len(items_db) == limit else None
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get("/summaries", response_model=SummaryResponse)
 async def get_all_summaries(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Get all summaries from database
+    Get all summaries from database, newest first
+    Pass next_cursor from the previous page as cursor (keyset pagination,
+    same cost at any depth); skip still works but scans every skipped row
     """
     try:
-        summaries_db = get_summaries(db, skip=skip, limit=limit)
+        if skip and not cursor:
+            summaries_db = await db_async.get_summaries(db, skip=skip, limit=limit)
+        else:
+            after = tuple(decode_cursor(cursor, datetime.fromisoformat, cursor_id)) if cursor else None
+            summaries_db = await db_async.get_summaries_page(db, after=after, limit=limit)
         
         summaries = [
             Summary(
@@ -151,11 +267,15 @@ async def get_all_summaries(
             for s in summaries_db
         ]
         
+        last = summaries_db[-1] if len(summaries_db) == limit else None
         return SummaryResponse(
             summaries=summaries,
-            total=len(summaries)
+            total=len(summaries),
+            next_cursor=encode_cursor(last.created_date.isoformat(), last.id) if last else None
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -166,31 +286,13 @@ async def generate_summaries(db: Session = Depends(get_db)):
     Generate summaries for news items that don't have them yet
     """
     try:
-        # Get news items
-        news_items_db = get_news_items(db, limit=100)
-        
-        # Convert to dict format
-        news_items = [
-            {
-                "id": item.id,
-                "title": item.title,
-                "content": item.content,
-                "url": item.url
-            }
-            for item in news_items_db
-        ]
-        
-        # Generate summaries
-        summaries = batch_summarize(news_items)
-        
-        # Save to database
-        for summary in summaries:
-            save_summary(db, summary)
+        # Work through news items without a summary until none are left
+        generated = await summarize_backlog(db)
         
         return {
             "success": True,
-            "summaries_generated": len(summaries),
-            "message": f"Generated {len(summaries)} summaries"
+            "summaries_generated": generated,
+            "message": f"Generated {generated} summaries"
         }
         
     except Exception as e:
@@ -250,10 +352,111 @@ async def publish_weekly():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def serialize_run(run) -> dict:
+    return {
+        "run_id": run.id,
+        "status": run.status,
+        "last_node": run.last_node,
+        "params": run.params,
+        "error": run.error,
+        "resumed": run.resumed,
+        "started_at": run.started_at.isoformat() if run.started_at else None,
+        "finished_at": run.finished_at.isoformat() if run.finished_at else None
+    }
+
+
+@app.get("/runs")
+async def list_runs(limit: int = 20, db: Session = Depends(get_db)):
+    """List recent agent runs with their status and last completed node"""
+    try:
+        from db import get_agent_runs
+        return {"runs": [serialize_run(run) for run in get_agent_runs(db, limit=limit)]}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/runs/{run_id}")
+async def get_run(run_id: str, db: Session = Depends(get_db)):
+    """Get the status of one agent run"""
+    try:
+        from db import get_agent_run
+        run = get_agent_run(db, run_id)
+        if not run:
+            raise HTTPException(status_code=404, detail="Run not found")
+        return serialize_run(run)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/runs/{run_id}/metrics")
+async def get_run_metrics(run_id: str, db: Session = Depends(get_db)):
+    """
+    Per-node metrics of an agent run: wall time, items in/out, LLM calls
+    and tokens, HTTP requests and bytes, and peak memory
+    """
+    try:
+        from db import get_agent_run, get_node_metrics
+        if not get_agent_run(db, run_id):
+            raise HTTPException(status_code=404, detail="Run not found")
+        
+        metrics = [
+            {
+                "node": metric.node,
+                "started_at": metric.started_at.isoformat() if metric.started_at else None,
+                "wall_time": metric.wall_time,
+                "items_in": metric.items_in,
+                "items_out": metric.items_out,
+                "llm_calls": metric.llm_calls,
+                "llm_tokens": metric.llm_tokens,
+                "http_requests": metric.http_requests,
+                "http_bytes": metric.http_bytes,
+                "peak_memory": metric.peak_memory,
+                "error": metric.error
+            }
+            for metric in get_node_metrics(db, run_id)
+        ]
+        nodes = [metric for metric in metrics if metric["node"] != "run"]
+        slowest = max(nodes, key=lambda metric: metric["wall_time"] or 0, default=None)
+        return {
+            "run_id": run_id,
+            "executions": [metric for metric in metrics if metric["node"] == "run"],
+            "nodes": nodes,
+            "slowest_node": slowest["node"] if slowest else None
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/runs/{run_id}/resume")
+async def resume_run(run_id: str):
+    """
+    Resume a failed agent run from its last completed node
+    Completed scraping, summaries and posts are reused from the checkpoint
+    """
+    try:
+        from agent import resume_agent
+        final_state = await resume_agent(run_id)
+        return {
+            "success": len(final_state.get("errors", [])) == 0,
+            "run_id": run_id,
+            "summaries": len(final_state.get("summaries", [])),
+            "posts_created": len(final_state.get("daily_posts", [])),
+            "errors": final_state.get("errors", [])
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get("/daily_report", response_model=DailyReportResponse)
 async def get_daily_report(
     date: str = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get daily report for a specific date
@@ -265,7 +468,7 @@ async def get_daily_report(
         else:
             target_date = datetime.utcnow()
         
-        summaries_db = get_summaries_by_date(db, target_date)
+        summaries_db = await db_async.get_summaries_by_date(db, target_date)
         
         summaries = [
             Summary(
@@ -301,7 +504,7 @@ async def get_daily_report(
 
 
 @app.get("/weekly_report", response_model=WeeklyReportResponse)
-async def get_weekly_report(db: Session = Depends(get_db)):
+async def get_weekly_report(db: AsyncSession = Depends(get_async_db)):
     """
     Get weekly report for the current week
     """
@@ -310,22 +513,15 @@ async def get_weekly_report(db: Session = Depends(get_db)):
         end_date = datetime.utcnow()
         start_date = end_date - timedelta(days=7)
         
-        # This is simplified - in production, you'd query across date range
-        summaries_db = get_summaries(db, limit=50)
-        
-        from agent import generate_weekly_report
+        from agent import generate_weekly_report, WEEKLY_REPORT_ITEMS
         from models import WeeklyReport
         
-        summaries_dict = [
-            {
-                "title": s.news_item_id,  # Would need to join with news_items
-                "three_sentence_summary": s.three_sentence_summary,
-                "tags": s.tags
-            }
-            for s in summaries_db
-        ]
+        # The newest of the week's summaries the report shows, with their
+        # news item titles, and the week's total (indexed range queries)
+        summaries = await db_async.get_enriched_summaries(db, limit=WEEKLY_REPORT_ITEMS, start=start_date, end=end_date)
+        summaries_count = await db_async.count_summaries(db, start=start_date, end=end_date)
         
-        report_data = generate_weekly_report(summaries_dict)
+        report_data = generate_weekly_report(summaries)
         
         report = WeeklyReport(
             week_start=start_date,
@@ -337,7 +533,7 @@ async def get_weekly_report(db: Session = Depends(get_db)):
         
         return WeeklyReportResponse(
             report=report,
-            summaries_count=len(summaries_db)
+            summaries_count=summaries_count
         )
         
     except Exception as e:
@@ -356,27 +552,15 @@ async def send_daily_email(recipient: str = None, db: Session = Depends(get_db))
         from email_service import send_daily_report_email
         
         # Get today's summaries
-        summaries_db = get_summaries_by_date(db, datetime.utcnow())
+        # Today's summaries with their news item titles, in one query
+        summaries = get_enriched_summaries(db, datetime.utcnow())
         
-        if not summaries_db:
+        if not summaries:
             return {
                 "success": False,
                 "message": "No summaries available for today"
             }
         
-        # Fetch news items and combine with summaries
-        summaries = []
-        for s in summaries_db:
-            # Get the corresponding news item
-            news_item = db.query(NewsItemDB).filter(NewsItemDB.id == s.news_item_id).first()
-            
-            summaries.append({
-                "title": news_item.title if news_item else "Untitled",
-                "three_sentence_summary": s.three_sentence_summary,
-                "tags": s.tags,
-                "created_date": s.created_date
-            })
-        
         result = await send_daily_report_email(summaries, recipient)
         return result
         
@@ -420,16 +604,7 @@ async def publish_devto(request: Request, db: Session = Depends(get_db)):
     """Publish to Dev.to (free)"""
     body = await request.json()
     from publisher_devto import publish_weekly_to_devto
-    summaries_db = get_summaries_by_date(db, datetime.utcnow())
-    summaries = []
-    for s in summaries_db:
-        news = db.query(NewsItemDB).filter(NewsItemDB.id == s.news_item_id).first()
-        summaries.append({
-            "title": news.title if news else "Untitled",
-            "three_sentence_summary": s.three_sentence_summary,
-            "social_hook": s.social_hook,
-            "tags": s.tags
-        })
+    summaries = get_enriched_summaries(db, datetime.utcnow())
     return await publish_weekly_to_devto(summaries, body.get("devtoApiKey"))
 
 @app.post("/publish/mastodon")
@@ -489,10 +664,10 @@ async def unsubscribe(email: str, db: Session = Depends(get_db)):
 
 
 @app.get("/subscribers")
-async def list_subscribers(db: Session = Depends(get_db)):
+async def list_subscribers(db: AsyncSession = Depends(get_async_db)):
     """Get all active subscribers (admin only in production)"""
     try:
-        subscribers = get_active_subscribers(db)
+        subscribers = await db_async.get_active_subscribers(db)
         return {
             "subscribers": [{"email": s.email, "created_date": s.created_date} for s in subscribers],
             "total": len(subscribers)
@@ -528,21 +703,12 @@ async def generate_daily_audio(request: Request, db: Session = Depends(get_db)):
         else:
             target_date = datetime.utcnow()
         
-        summaries_db = get_summaries_by_date(db, target_date)
+        # Summaries with their news item titles, in one query
+        summaries = get_enriched_summaries(db, target_date)
         
-        if not summaries_db:
+        if not summaries:
             raise HTTPException(status_code=404, detail="No summaries available for this date")
         
-        # Build summary list with titles
-        summaries = []
-        for s in summaries_db:
-            news_item = db.query(NewsItemDB).filter(NewsItemDB.id == s.news_item_id).first()
-            summaries.append({
-                "title": news_item.title if news_item else "Untitled",
-                "three_sentence_summary": s.three_sentence_summary,
-                "tags": s.tags
-            })
-        
         # Generate audio with Edge TTS (FREE!)
         from tts_service import generate_daily_podcast, DEFAULT_VOICE_ID
         audio_data = await generate_daily_podcast(
@@ -590,22 +756,12 @@ async def generate_weekly_audio(request: Request, db: Session = Depends(get_db))
         end_date = datetime.utcnow()
         start_date = end_date - timedelta(days=7)
         
-        # Get all recent summaries
-        summaries_db = get_summaries(db, limit=50)
+        # The week's most recent summaries
+        summaries = get_enriched_summaries(db, limit=50, start=start_date, end=end_date)
         
-        if not summaries_db:
+        if not summaries:
             raise HTTPException(status_code=404, detail="No summaries available")
         
-        # Build summary list with titles
-        summaries = []
-        for s in summaries_db:
-            news_item = db.query(NewsItemDB).filter(NewsItemDB.id == s.news_item_id).first()
-            summaries.append({
-                "title": news_item.title if news_item else "Untitled",
-                "three_sentence_summary": s.three_sentence_summary,
-                "tags": s.tags
-            })
-        
         # Generate audio with Edge TTS (FREE!)
         from tts_service import generate_weekly_podcast, DEFAULT_VOICE_ID
         audio_data = await generate_weekly_podcast(
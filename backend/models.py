@@ -23,6 +23,13 @@ class NewsItem(BaseModel):
         from_attributes = True
 
 
+class SummaryContent(BaseModel):
+    """LLM-generated fields of a Summary (structured output schema)"""
+    three_sentence_summary: str = Field(min_length=1)
+    social_hook: str = Field(min_length=1)
+    tags: List[str] = []
+
+
 class Summary(BaseModel):
     """Model for a generated summary"""
     id: Optional[int] = None
@@ -103,6 +110,14 @@ class SummaryResponse(BaseModel):
     """Response model for summaries endpoint"""
     summaries: List[Summary]
     total: int
+    next_cursor: Optional[str] = None  # Pass as ?cursor= for the next page
+
+
+class NewsResponse(BaseModel):
+    """Response model for news listing endpoint"""
+    news: List[NewsItem]
+    total: int
+    next_cursor: Optional[str] = None
 
 
 class PublishResponse(BaseModel):
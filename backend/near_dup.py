@@ -0,0 +1,226 @@
+"""
+Near-duplicate detection with MinHash signatures and banded LSH
+Catches the same story reposted across sources with small wording changes,
+which the hash-based embeddings in dedupe.py cannot see
+
+Each item is reduced to character shingles, summarised by NUM_PERM min-hashes,
+and the signature is split into LSH_BANDS bands. Items sharing any band land
+in the same bucket and become candidates; candidates are confirmed by the
+estimated Jaccard similarity. Lookups cost O(bands), independent of archive size.
+"""
+import os
+import re
+import zlib
+import hashlib
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+NUM_PERM = 128
+LSH_BANDS = 16  # 16 bands x 8 rows: candidate threshold ~ (1/16)^(1/8) = 0.71
+SHINGLE_SIZE = 5
+NEAR_DUP_THRESHOLD = float(os.getenv("NEAR_DUP_THRESHOLD", "0.7"))
+# Content is truncated so the same story with bodies of different length still overlaps
+NEAR_DUP_CONTENT_CHARS = int(os.getenv("NEAR_DUP_CONTENT_CHARS", "200"))
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Fixed seed: persisted signatures must stay comparable across runs
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, _MAX_HASH, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, _MAX_HASH, size=NUM_PERM, dtype=np.uint64)
+
+
+def item_text(item: Dict) -> str:
+    """Text used for near-duplicate detection"""
+    content = item.get("content") or ""
+    return f"{item.get('title', '')} {content[:NEAR_DUP_CONTENT_CHARS]}"
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> np.ndarray:
+    """
+    Hash the character shingles of normalised text to stable 32-bit values
+    """
+    text = re.sub(r"[^a-z0-9 ]+", "", re.sub(r"\s+", " ", text.lower())).strip()
+    if len(text) < size:
+        text = text.ljust(size)
+    values = {zlib.crc32(text[i:i + size].encode()) for i in range(len(text) - size + 1)}
+    return np.fromiter(values, dtype=np.uint64, count=len(values))
+
+
+def minhash_signature(text: str) -> np.ndarray:
+    """
+    Compute the MinHash signature of a text
+
+    Returns:
+        NUM_PERM uint32 values
+    """
+    hashes = shingles(text)
+    # (a * x + b) mod p, truncated to 32 bits, for every permutation at once
+    permuted = (np.outer(_PERM_A, hashes) + _PERM_B[:, None]) % _MERSENNE_PRIME & _MAX_HASH
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def estimate_jaccard(signature1: np.ndarray, signature2: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return float(np.mean(signature1 == signature2))
+
+
+def bucket_keys(signature: np.ndarray, bands: int = LSH_BANDS) -> List[int]:
+    """
+    One bucket key per band, stable across processes and small enough for a SQLite INTEGER
+    """
+    keys = []
+    for band, values in enumerate(np.split(signature, bands)):
+        digest = hashlib.blake2b(bytes([band]) + values.tobytes(), digest_size=8).digest()
+        keys.append(int.from_bytes(digest, "big") >> 1)
+    return keys
+
+
+def signature_rows(news_item_id: int, signature) -> list:
+    """Signature and LSH bucket rows of a saved item, for the caller to add and commit"""
+    from db import MinHashSignatureDB, LSHBucketDB
+
+    signature = np.asarray(signature, dtype=np.uint32)
+    return [MinHashSignatureDB(news_item_id=news_item_id, signature=signature.tobytes())] + [
+        LSHBucketDB(bucket_key=key, news_item_id=news_item_id)
+        for key in bucket_keys(signature)
+    ]
+
+
+def store_signature(db, news_item_id: int, signature) -> None:
+    """Persist a saved item's signature and its LSH buckets"""
+    try:
+        db.add_all(signature_rows(news_item_id, signature))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Error saving MinHash signature: {e}")
+
+
+class MinHashLSH:
+    """
+    LSH index over MinHash signatures
+
+    Buckets of archived items are read from the database (when a session is
+    given); items accepted during the current run are kept in memory until
+    they are saved.
+    """
+
+    def __init__(self, db=None, threshold: float = NEAR_DUP_THRESHOLD):
+        self.db = db
+        self.threshold = threshold
+        self._buckets: Dict[int, List[int]] = {}
+        self._signatures: Dict[int, np.ndarray] = {}
+        self._pending = 0
+
+    def _archived_candidates(self, keys: List[int]) -> Dict[int, np.ndarray]:
+        if self.db is None:
+            return {}
+        from db import MinHashSignatureDB, LSHBucketDB
+
+        rows = self.db.query(MinHashSignatureDB.news_item_id, MinHashSignatureDB.signature)\
+            .join(LSHBucketDB, LSHBucketDB.news_item_id == MinHashSignatureDB.news_item_id)\
+            .filter(LSHBucketDB.bucket_key.in_(keys))\
+            .distinct()\
+            .all()
+        return {
+            news_item_id: np.frombuffer(signature, dtype=np.uint32)
+            for news_item_id, signature in rows
+        }
+
+    def query(self, signature: np.ndarray) -> Tuple[Optional[int], float]:
+        """
+        Find the most similar archived or accepted item among the LSH candidates
+
+        Returns:
+            Tuple of (match key or None, best estimated Jaccard similarity)
+            Archived items are keyed by news item id, pending ones by negative numbers
+        """
+        keys = bucket_keys(signature)
+        candidates = self._archived_candidates(keys)
+        for key in keys:
+            for pending_key in self._buckets.get(key, []):
+                candidates[pending_key] = self._signatures[pending_key]
+
+        best_key, best_similarity = None, 0.0
+        for candidate_key, candidate in candidates.items():
+            similarity = estimate_jaccard(signature, candidate)
+            if similarity > best_similarity:
+                best_key, best_similarity = candidate_key, similarity
+        return best_key, best_similarity
+
+    def insert(self, signature: np.ndarray) -> None:
+        """Remember an accepted item for the rest of this run"""
+        self._pending += 1
+        pending_key = -self._pending
+        self._signatures[pending_key] = signature
+        for key in bucket_keys(signature):
+            self._buckets.setdefault(key, []).append(pending_key)
+
+    def filter(self, items: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Split items into (unique, near-duplicate)
+
+        Every item gets a "minhash" signature, which save_news_item and bulk_save_news_items persist.
+        Near-duplicates are marked is_duplicate with novelty 1 - similarity.
+        """
+        unique_items = []
+        duplicate_items = []
+
+        for item in items:
+            signature = minhash_signature(item_text(item))
+            item["minhash"] = signature.tolist()  # Plain list keeps items JSON-serialisable
+            match, similarity = self.query(signature)
+
+            if match is not None and similarity >= self.threshold:
+                item["is_duplicate"] = True
+                item["novelty_score"] = 1.0 - similarity
+                duplicate_items.append(item)
+            else:
+                item["is_duplicate"] = False
+                item["novelty_score"] = 1.0 - similarity
+                unique_items.append(item)
+                self.insert(signature)
+
+        return unique_items, duplicate_items
+
+
+def backfill_signatures(db, batch_size: int = 500) -> int:
+    """
+    Compute signatures for archived news items that do not have one yet
+
+    Returns:
+        Number of signatures stored
+    """
+    from db import NewsItemDB, MinHashSignatureDB
+
+    stored = 0
+    last_id = 0
+    while True:
+        rows = db.query(NewsItemDB.id, NewsItemDB.title, NewsItemDB.content)\
+            .outerjoin(MinHashSignatureDB, MinHashSignatureDB.news_item_id == NewsItemDB.id)\
+            .filter(NewsItemDB.id > last_id, MinHashSignatureDB.news_item_id.is_(None))\
+            .order_by(NewsItemDB.id)\
+            .limit(batch_size)\
+            .all()
+        if not rows:
+            return stored
+        last_id = rows[-1][0]
+
+        for news_item_id, title, content in rows:
+            signature = minhash_signature(item_text({"title": title, "content": content}))
+            store_signature(db, news_item_id, signature)
+            stored += 1
+
+
+if __name__ == "__main__":
+    # Usage: python near_dup.py  -- backfill signatures for archived items
+    from db import SessionLocal, init_db
+
+    init_db()
+    db = SessionLocal()
+    try:
+        print(f"✅ Stored {backfill_signatures(db)} MinHash signatures")
+    finally:
+        db.close()
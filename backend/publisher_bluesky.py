@@ -6,6 +6,7 @@ import os
 import httpx
 from typing import Dict, Optional
 from datetime import datetime
+from tracing import HTTP_EVENT_HOOKS
 
 
 class BlueskyPublisher:
@@ -28,7 +29,7 @@ class BlueskyPublisher:
     async def authenticate(self) -> bool:
         """Authenticate with Bluesky and get session token"""
         try:
-            async with httpx.AsyncClient() as client:
+            async with httpx.AsyncClient(event_hooks=HTTP_EVENT_HOOKS) as client:
                 response = await client.post(
                     f"{self.base_url}/com.atproto.server.createSession",
                     json={
@@ -76,7 +77,7 @@ class BlueskyPublisher:
                 text = text[:297] + "..."
             
             # Create post
-            async with httpx.AsyncClient() as client:
+            async with httpx.AsyncClient(event_hooks=HTTP_EVENT_HOOKS) as client:
                 response = await client.post(
                     f"{self.base_url}/com.atproto.repo.createRecord",
                     headers={
@@ -6,6 +6,7 @@ import os
 import httpx
 from typing import Dict, Optional
 from datetime import datetime
+from tracing import HTTP_EVENT_HOOKS
 
 
 class DevToPublisher:
@@ -36,7 +37,7 @@ class DevToPublisher:
         
         try:
             with open(image_path, 'rb') as image_file:
-                async with httpx.AsyncClient(timeout=60.0) as client:
+                async with httpx.AsyncClient(event_hooks=HTTP_EVENT_HOOKS, timeout=60.0) as client:
                     response = await client.post(
                         f"{self.base_url}/images",
                         headers={"api-key": self.api_key},
@@ -94,7 +95,7 @@ class DevToPublisher:
             if cover_image:
                 article_data["main_image"] = cover_image
             
-            async with httpx.AsyncClient() as client:
+            async with httpx.AsyncClient(event_hooks=HTTP_EVENT_HOOKS) as client:
                 response = await client.post(
                     f"{self.base_url}/articles",
                     headers={
@@ -5,6 +5,7 @@ Free API for professional sharing
 import os
 import httpx
 from typing import Dict, Optional
+from tracing import HTTP_EVENT_HOOKS
 
 
 class LinkedInPublisher:
@@ -37,7 +38,7 @@ class LinkedInPublisher:
         
         try:
             # Get user's profile URN first
-            async with httpx.AsyncClient() as client:
+            async with httpx.AsyncClient(event_hooks=HTTP_EVENT_HOOKS) as client:
                 # Get user info
                 me_response = await client.get(
                     f"{self.base_url}/me",
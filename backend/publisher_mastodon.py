@@ -6,6 +6,7 @@ import os
 import httpx
 from typing import Dict, Optional
 from datetime import datetime
+from tracing import HTTP_EVENT_HOOKS
 
 
 class MastodonPublisher:
@@ -39,7 +40,7 @@ class MastodonPublisher:
         
         try:
             with open(image_path, 'rb') as image_file:
-                async with httpx.AsyncClient(timeout=60.0) as client:
+                async with httpx.AsyncClient(event_hooks=HTTP_EVENT_HOOKS, timeout=60.0) as client:
                     response = await client.post(
                         f"{self.instance}/api/v2/media",
                         headers={"Authorization": f"Bearer {self.access_token}"},
@@ -91,7 +92,7 @@ class MastodonPublisher:
             if media_ids:
                 payload["media_ids"] = media_ids
             
-            async with httpx.AsyncClient() as client:
+            async with httpx.AsyncClient(event_hooks=HTTP_EVENT_HOOKS) as client:
                 response = await client.post(
                     f"{self.instance}/api/v1/statuses",
                     headers={
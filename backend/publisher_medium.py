@@ -8,6 +8,7 @@ import json
 from typing import Dict, Optional
 from datetime import datetime
 import httpx
+from tracing import HTTP_EVENT_HOOKS
 
 USE_MOCK_MODE = os.getenv("USE_MOCK_MODE", "True").lower() == "true"
 
@@ -34,7 +35,7 @@ async def get_medium_user_id() -> Optional[str]:
             "Accept": "application/json"
         }
         
-        async with httpx.AsyncClient() as client:
+        async with httpx.AsyncClient(event_hooks=HTTP_EVENT_HOOKS) as client:
             response = await client.get(url, headers=headers)
             
             if response.status_code == 200:
@@ -102,7 +103,7 @@ async def post_to_medium(title: str, content: str, tags: list = None) -> Dict:
             "publishStatus": "draft"  # Always create as draft for review
         }
         
-        async with httpx.AsyncClient() as client:
+        async with httpx.AsyncClient(event_hooks=HTTP_EVENT_HOOKS) as client:
             response = await client.post(url, headers=headers, json=payload)
             
             if response.status_code == 201:
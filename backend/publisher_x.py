@@ -7,6 +7,7 @@ import json
 from typing import Dict, Optional
 from datetime import datetime
 import httpx
+from tracing import HTTP_EVENT_HOOKS
 
 USE_MOCK_MODE = os.getenv("USE_MOCK_MODE", "True").lower() == "true"
 
@@ -54,7 +55,7 @@ async def post_to_twitter(tweet_text: str) -> Dict:
             "text": tweet_text
         }
         
-        async with httpx.AsyncClient() as client:
+        async with httpx.AsyncClient(event_hooks=HTTP_EVENT_HOOKS) as client:
             response = await client.post(url, headers=headers, json=payload)
             
             if response.status_code == 201:
@@ -3,19 +3,61 @@ News scraping module for multiple sources: RSS, GitHub, Blogs
 Supports mock mode for testing without internet
 """
 import os
+import time
+import asyncio
 import feedparser
 import httpx
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import List, Dict, Optional, Tuple, Callable, Awaitable
 from datetime import datetime, timedelta
 from bs4 import BeautifulSoup
 
+from http_cache import conditional_get, record_parsed
+from token_budget import strip_html
+
 
 # Importing the newly added reddit scraping code
-from scraper_reddit import get_reddit_headlines
+from scraper_reddit import scrape_reddit
+from tracing import HTTP_EVENT_HOOKS
 
 # Change to False to enable real scraping
 USE_MOCK_MODE = os.getenv("USE_MOCK_MODE", "False").lower() == "true"
 
+# Time budgets (seconds) for the concurrent scrape engine
+SCRAPE_SOURCE_TIMEOUT = float(os.getenv("SCRAPE_SOURCE_TIMEOUT", "30"))
+SCRAPE_TOTAL_TIMEOUT = float(os.getenv("SCRAPE_TOTAL_TIMEOUT", "60"))
+
+# RSS feeds to scrape
+RSS_FEEDS = [
+    "http://export.arxiv.org/rss/cs.AI",  # ArXiv AI papers
+    "https://blog.google/technology/ai/feed/",  # Google AI Blog
+    "https://openai.com/blog/rss.xml",  # OpenAI Blog
+    "https://www.deepmind.com/blog/rss.xml",  # DeepMind Blog
+    "https://blogs.nvidia.com/feed/",  # NVIDIA Blog
+    "https://ai.meta.com/blog/feed/",  # Meta AI
+    "https://www.anthropic.com/news/rss.xml",  # Anthropic
+    "https://huggingface.co/blog/feed.xml",  # Hugging Face
+]
+RSS_ENTRIES_PER_FEED = int(os.getenv("RSS_ENTRIES_PER_FEED", "3"))
+RSS_CONTENT_MAX_CHARS = int(os.getenv("RSS_CONTENT_MAX_CHARS", "500"))
+
+# Worker pool for feed parsing, which is CPU-bound and would block the event loop
+_rss_parse_pool = ThreadPoolExecutor(
+    max_workers=int(os.getenv("RSS_PARSE_WORKERS", "4")),
+    thread_name_prefix="rss-parse"
+)
+
+# HackerNews API endpoints and fetch settings
+HN_TOP_STORIES_URL = "https://hacker-news.firebaseio.com/v0/topstories.json"
+HN_ITEM_URL = "https://hacker-news.firebaseio.com/v0/item/{}.json"
+HN_FETCH_CONCURRENCY = int(os.getenv("HN_FETCH_CONCURRENCY", "10"))
+
+# Filter for AI/ML keywords
+HN_AI_KEYWORDS = ['ai', 'ml', 'machine learning', 'deep learning', 'neural',
+                  'llm', 'gpt', 'transformer', 'model', 'artificial intelligence',
+                  'chatgpt', 'openai', 'anthropic', 'claude', 'gemini', 'llama']
+
 
 # Mock data for testing
 MOCK_NEWS_DATA = [
@@ -79,10 +121,13 @@ async def scrape_arxiv(query: str = "artificial intelligence", max_results: int
     return [item for item in MOCK_NEWS_DATA if item["source"] == "arxiv"]
 
 
-async def scrape_github_trending() -> List[Dict]:
+async def scrape_github_trending(use_cache: bool = True) -> List[Dict]:
     """
     Scrape GitHub trending repositories (AI/ML focused)
     
+    Args:
+        use_cache: Send conditional GET validators (see http_cache.conditional_get)
+    
     Returns:
         List of trending GitHub repos
     """
@@ -93,8 +138,13 @@ async def scrape_github_trending() -> List[Dict]:
         url = "https://github.com/trending/python?since=daily"
         print(f"  Fetching GitHub trending: {url}")
         
-        async with httpx.AsyncClient(follow_redirects=True, timeout=10.0) as client:
-            response = await client.get(url)
+        async with httpx.AsyncClient(event_hooks=HTTP_EVENT_HOOKS, follow_redirects=True, timeout=10.0) as client:
+            response = await conditional_get(client, url, "github", use_cache)
+            if response is None:
+                print(f"  ✓ GitHub trending not modified since last scrape")
+                return []
+            
+            parse_start = time.perf_counter()
             soup = BeautifulSoup(response.text, 'html.parser')
             
             items = []
@@ -134,6 +184,7 @@ async def scrape_github_trending() -> List[Dict]:
                     print(f"  ✗ Error parsing repo: {e}")
                     continue
             
+            await record_parsed(url, "github", response, time.perf_counter() - parse_start, use_cache)
             print(f"  ✓ Got {len(items)} AI/ML repos")
             return items
             
@@ -142,61 +193,118 @@ async def scrape_github_trending() -> List[Dict]:
         return []
 
 
-async def scrape_rss_feeds() -> List[Dict]:
+async def scrape_rss_feeds(
+    entries_per_feed: int = RSS_ENTRIES_PER_FEED,
+    max_content_chars: int = RSS_CONTENT_MAX_CHARS,
+    use_cache: bool = True
+) -> List[Dict]:
     """
     Scrape AI/ML news from RSS feeds
     
+    All feeds are downloaded in parallel through one shared async client,
+    and parsing runs in a worker pool so the event loop stays responsive.
+    
+    Args:
+        entries_per_feed: Maximum number of entries to keep from each feed
+        max_content_chars: Truncate entry content to this many characters
+        use_cache: Send conditional GET validators (see http_cache.conditional_get)
+    
     Returns:
         List of news items from RSS feeds
     """
     if USE_MOCK_MODE:
         return [item for item in MOCK_NEWS_DATA if item["source"] == "rss"]
     
-  # RSS feeds to scrape
-    RSS_FEEDS = [
-        "http://export.arxiv.org/rss/cs.AI",  # ArXiv AI papers
-        "https://blog.google/technology/ai/feed/",  # Google AI Blog
-        "https://openai.com/blog/rss.xml",  # OpenAI Blog
-        "https://www.deepmind.com/blog/rss.xml",  # DeepMind Blog
-        "https://blogs.nvidia.com/feed/",  # NVIDIA Blog
-        "https://ai.meta.com/blog/feed/",  # Meta AI
-        "https://www.anthropic.com/news/rss.xml",  # Anthropic
-        "https://huggingface.co/blog/feed.xml",  # Hugging Face
-    ]
+    async with httpx.AsyncClient(event_hooks=HTTP_EVENT_HOOKS, follow_redirects=True, timeout=10.0) as client:
+        feed_results = await asyncio.gather(*(
+            fetch_rss_feed(client, feed_url, entries_per_feed, max_content_chars, use_cache)
+            for feed_url in RSS_FEEDS
+        ))
     
+    # Flatten in feed order so the output stays deterministic
     items = []
+    for feed_items in feed_results:
+        items.extend(feed_items)
     
-    for feed_url in RSS_FEEDS:
-        try:
-            print(f"  Fetching RSS feed: {feed_url}")
-            feed = feedparser.parse(feed_url)
-            for entry in feed.entries[:3]:  # Limit to 3 per feed
-                pub_date = datetime.utcnow()
-                if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                    try:
-                        pub_date = datetime(*entry.published_parsed[:6])
-                    except:
-                        pass
-                
-                items.append({
-                    "title": entry.get('title', 'No title'),
-                    "url": entry.get('link', ''),
-                    "source": "rss",
-                    "content": entry.get('summary', entry.get('description', ''))[:500],
-                    "published_date": pub_date
-                })
-            print(f"  ✓ Got {len(feed.entries[:3])} items from {feed_url}")
-        except Exception as e:
-            print(f"  ✗ Error scraping RSS feed {feed_url}: {e}")
-            continue
+    return items
+
+
+async def fetch_rss_feed(
+    client: httpx.AsyncClient,
+    feed_url: str,
+    entries_per_feed: int = RSS_ENTRIES_PER_FEED,
+    max_content_chars: int = RSS_CONTENT_MAX_CHARS,
+    use_cache: bool = True
+) -> List[Dict]:
+    """
+    Download a single RSS feed and parse it off the event loop
+    
+    Returns:
+        List of news items from the feed (empty on error)
+    """
+    try:
+        print(f"  Fetching RSS feed: {feed_url}")
+        response = await conditional_get(client, feed_url, "rss", use_cache)
+        if response is None:
+            print(f"  ✓ Not modified since last scrape: {feed_url}")
+            return []
+        response.raise_for_status()
+        
+        loop = asyncio.get_running_loop()
+        parse_start = time.perf_counter()
+        items = await loop.run_in_executor(
+            _rss_parse_pool, parse_feed_entries,
+            response.content, entries_per_feed, max_content_chars
+        )
+        await record_parsed(feed_url, "rss", response, time.perf_counter() - parse_start, use_cache)
+        print(f"  ✓ Got {len(items)} items from {feed_url}")
+        return items
+    except Exception as e:
+        print(f"  ✗ Error scraping RSS feed {feed_url}: {e}")
+        return []
+
+
+def parse_feed_entries(content: bytes, entries_per_feed: int, max_content_chars: int) -> List[Dict]:
+    """
+    Parse raw feed XML into news items (CPU-bound, runs in the worker pool)
+    
+    Args:
+        content: Raw feed document
+        entries_per_feed: Maximum number of entries to keep
+        max_content_chars: Truncate entry content to this many characters
+        
+    Returns:
+        List of news items
+    """
+    feed = feedparser.parse(content)
+    items = []
+    
+    for entry in feed.entries[:entries_per_feed]:
+        pub_date = datetime.utcnow()
+        if hasattr(entry, 'published_parsed') and entry.published_parsed:
+            try:
+                pub_date = datetime(*entry.published_parsed[:6])
+            except:
+                pass
+        
+        items.append({
+            "title": entry.get('title', 'No title'),
+            "url": entry.get('link', ''),
+            "source": "rss",
+            "content": strip_html(entry.get('summary', entry.get('description', '')))[:max_content_chars],
+            "published_date": pub_date
+        })
     
     return items
 
 
-async def scrape_blogs() -> List[Dict]:
+async def scrape_blogs(use_cache: bool = True) -> List[Dict]:
     """
     Scrape AI/ML blogs and product announcements
     
+    Args:
+        use_cache: Send conditional GET validators (see http_cache.conditional_get)
+    
     Returns:
         List of news items from blogs
     """
@@ -209,73 +317,225 @@ async def scrape_blogs() -> List[Dict]:
         "https://www.anthropic.com/news"
     ]
     
-    items = []
+    async with httpx.AsyncClient(event_hooks=HTTP_EVENT_HOOKS, timeout=10.0) as client:
+        blog_results = await asyncio.gather(*(scrape_blog(client, url, use_cache) for url in blog_urls))
     
-    for url in blog_urls:
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, timeout=10.0)
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # This is a simplified scraper - in production, each blog would need custom selectors
-                articles = soup.find_all('article')[:2]
-                
-                for article in articles:
-                    title_elem = article.find(['h2', 'h3', 'h1'])
-                    link_elem = article.find('a')
-                    
-                    if title_elem and link_elem:
-                        items.append({
-                            "title": title_elem.get_text(strip=True),
-                            "url": link_elem.get('href', ''),
-                            "source": "blog",
-                            "content": article.get_text(strip=True)[:500],
-                            "published_date": datetime.utcnow()
-                        })
-        except Exception as e:
-            print(f"Error scraping blog {url}: {e}")
-            continue
+    items = []
+    for blog_items in blog_results:
+        items.extend(blog_items)
     
     return items
 
 
-async def scrape_all_sources() -> List[Dict]:
+async def scrape_blog(client: httpx.AsyncClient, url: str, use_cache: bool = True) -> List[Dict]:
     """
-    Scrape all news sources
+    Scrape a single blog index page
     
     Returns:
-        Combined list of all news items
+        List of news items from the blog (empty if unchanged or on error)
+    """
+    try:
+        response = await conditional_get(client, url, "blog", use_cache)
+        if response is None:
+            print(f"  ✓ Blog not modified since last scrape: {url}")
+            return []
+        
+        parse_start = time.perf_counter()
+        soup = BeautifulSoup(response.text, 'html.parser')
+        items = []
+        
+        # This is a simplified scraper - in production, each blog would need custom selectors
+        articles = soup.find_all('article')[:2]
+        
+        for article in articles:
+            title_elem = article.find(['h2', 'h3', 'h1'])
+            link_elem = article.find('a')
+            
+            if title_elem and link_elem:
+                items.append({
+                    "title": title_elem.get_text(strip=True),
+                    "url": link_elem.get('href', ''),
+                    "source": "blog",
+                    "content": article.get_text(" ", strip=True)[:500],
+                    "published_date": datetime.utcnow()
+                })
+        
+        await record_parsed(url, "blog", response, time.perf_counter() - parse_start, use_cache)
+        return items
+    except Exception as e:
+        print(f"Error scraping blog {url}: {e}")
+        return []
+
+
+async def _run_source(name: str, fetch: Callable[[], Awaitable[List[Dict]]],
+                      timeout: float, report: Dict[str, Dict]) -> List[Dict]:
+    """
+    Run a single source under its own timeout and record its stats in `report`
+    
+    A source that fails or times out yields an empty list instead of raising,
+    so it never takes the other sources down with it.
+    """
+    stats = {"status": "ok", "items": 0, "wall_time": 0.0, "error": None}
+    report[name] = stats
+    start = time.perf_counter()
+    
+    try:
+        items = await asyncio.wait_for(fetch(), timeout=timeout)
+        stats["items"] = len(items)
+        return items
+    except asyncio.TimeoutError:
+        stats["status"] = "timeout"
+        stats["error"] = f"exceeded {timeout:g}s source budget"
+        return []
+    except asyncio.CancelledError:
+        stats["status"] = "cancelled"
+        stats["error"] = "exceeded overall scrape budget"
+        raise
+    except Exception as e:
+        stats["status"] = "error"
+        stats["error"] = str(e)
+        return []
+    finally:
+        stats["wall_time"] = round(time.perf_counter() - start, 3)
+
+
+async def run_scrape_engine(
+    sources: Dict[str, Callable[[], Awaitable[List[Dict]]]],
+    source_timeout: float = SCRAPE_SOURCE_TIMEOUT,
+    total_timeout: float = SCRAPE_TOTAL_TIMEOUT,
+    on_items: Optional[Callable[[str, List[Dict]], Awaitable[None]]] = None
+) -> Tuple[List[Dict], Dict]:
+    """
+    Run all sources concurrently with a per-source and an overall time budget
+    
+    Sources still running when the overall budget runs out are cancelled;
+    results from sources that already finished are kept.
+    
+    Args:
+        sources: Mapping of source name to a zero-arg coroutine factory
+        source_timeout: Time budget for each individual source
+        total_timeout: Time budget for the whole scrape
+        on_items: Optional coroutine called with (source name, items) as soon
+            as each source finishes, for consumers that stream items onwards
+        
+    Returns:
+        Tuple of (items in source order, report with per-source stats)
     """
+    start = time.perf_counter()
+    per_source: Dict[str, Dict] = {}
+    # Finished sources are handed to on_items by a forwarder outside the timed
+    # tasks, so a slow consumer cannot use up the scrape budget
+    finished: asyncio.Queue = asyncio.Queue()
+    
+    async def run(name: str, fetch: Callable[[], Awaitable[List[Dict]]]) -> List[Dict]:
+        items = await _run_source(name, fetch, source_timeout, per_source)
+        if items:
+            finished.put_nowait((name, items))
+        return items
+    
+    async def forward() -> None:
+        while True:
+            result = await finished.get()
+            if result is None:
+                return
+            await on_items(*result)
+    
+    forwarder = asyncio.create_task(forward()) if on_items is not None else None
+    tasks = {
+        name: asyncio.create_task(run(name, fetch))
+        for name, fetch in sources.items()
+    }
+    
+    _, pending = await asyncio.wait(tasks.values(), timeout=total_timeout)
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+    wall_time = round(time.perf_counter() - start, 3)
+    
+    if forwarder is not None:
+        finished.put_nowait(None)
+        await forwarder
+    
     all_items = []
+    for name, task in tasks.items():
+        if not task.cancelled() and task.exception() is None:
+            all_items.extend(task.result())
     
-    # Scrape all sources
-    arxiv_items = await scrape_arxiv()
-    github_items = await scrape_github_trending()
-    rss_items = await scrape_rss_feeds()
-    blog_items = await scrape_blogs()
-    hn_items = await scrape_hackernews()
+    report = {
+        "wall_time": wall_time,
+        "total_items": len(all_items),
+        "sources": per_source
+    }
+    return all_items, report
+
+
+def print_scrape_report(report: Dict) -> None:
+    """Print per-source timing and item counts from a scrape report"""
+    print(f"  Scrape finished in {report['wall_time']:.2f}s with {report['total_items']} items")
+    for name, stats in report["sources"].items():
+        marker = "✓" if stats["status"] == "ok" else "✗"
+        line = f"   {marker} {name}: {stats['items']} items in {stats['wall_time']:.2f}s"
+        if stats["error"]:
+            line += f" ({stats['status']}: {stats['error']})"
+        print(line)
+
+
+def get_scrape_sources(use_cache: bool = True) -> Dict[str, Callable[[], Awaitable[List[Dict]]]]:
+    """
+    All news sources, by name
     
-    # Added reddit source
-    reddit_data = get_reddit_headlines()
+    Args:
+        use_cache: Let sources answer "not modified" from the HTTP cache; pass
+            False when the scraped items are not stored (agent runs, streaming)
+    """
+    return {
+        "arxiv": scrape_arxiv,
+        "github": partial(scrape_github_trending, use_cache=use_cache),
+        "rss": partial(scrape_rss_feeds, use_cache=use_cache),
+        "blogs": partial(scrape_blogs, use_cache=use_cache),
+        "hackernews": scrape_hackernews,
+        "reddit": scrape_reddit,
+    }
 
 
-    all_items.extend(arxiv_items)
-    all_items.extend(github_items)
-    all_items.extend(rss_items)
-    all_items.extend(blog_items)
-    all_items.extend(hn_items)
-    all_items.extend(reddit_data)
+async def scrape_all_sources_with_report(use_cache: bool = True) -> Tuple[List[Dict], Dict]:
+    """
+    Scrape all news sources concurrently
     
+    Args:
+        use_cache: See get_scrape_sources
+    
+    Returns:
+        Tuple of (combined list of all news items, per-source scrape report)
+    """
+    all_items, report = await run_scrape_engine(get_scrape_sources(use_cache))
+    print_scrape_report(report)
+    return all_items, report
+
+
+async def scrape_all_sources(use_cache: bool = True) -> List[Dict]:
+    """
+    Scrape all news sources
+    
+    Args:
+        use_cache: See get_scrape_sources
+    
+    Returns:
+        Combined list of all news items
+    """
+    all_items, _ = await scrape_all_sources_with_report(use_cache)
     return all_items
 
 
-async def scrape_hackernews(max_results: int = 10) -> List[Dict]:
+async def scrape_hackernews(max_results: int = 10, concurrency: int = HN_FETCH_CONCURRENCY) -> List[Dict]:
     """
     Scrape top AI/ML stories from HackerNews using their official API
     No authentication required
     
     Args:
         max_results: Maximum number of stories to return (default: 10)
+        concurrency: Maximum number of story requests in flight at once
     
     Returns:
         List of news items from HackerNews
@@ -286,62 +546,14 @@ async def scrape_hackernews(max_results: int = 10) -> List[Dict]:
     try:
         print(f" Fetching HackerNews top stories...")
         
-        # HackerNews API endpoints
-        TOP_STORIES_URL = "https://hacker-news.firebaseio.com/v0/topstories.json"
-        ITEM_URL = "https://hacker-news.firebaseio.com/v0/item/{}.json"
-        
-        items = []
-        
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with httpx.AsyncClient(event_hooks=HTTP_EVENT_HOOKS, timeout=10.0) as client:
             # Get top story IDs
-            response = await client.get(TOP_STORIES_URL)
+            response = await client.get(HN_TOP_STORIES_URL)
             story_ids = response.json()[:50]  # Get top 50 IDs
             
             print(f" Got {len(story_ids)} top story IDs")
             
-            # Filter for AI/ML keywords
-            ai_keywords = ['ai', 'ml', 'machine learning', 'deep learning', 'neural', 
-                         'llm', 'gpt', 'transformer', 'model', 'artificial intelligence',
-                         'chatgpt', 'openai', 'anthropic', 'claude', 'gemini', 'llama']
-            
-            # Fetch story details
-            for story_id in story_ids:
-                if len(items) >= max_results:
-                    break
-                    
-                try:
-                    story_response = await client.get(ITEM_URL.format(story_id))
-                    story = story_response.json()
-                    
-                    # Skip if not a story or no title
-                    if not story or story.get('type') != 'story' or 'title' not in story:
-                        continue
-                    
-                    title = story.get('title', '')
-                    url = story.get('url', f"https://news.ycombinator.com/item?id={story_id}")
-                    text = story.get('text', '')
-                    
-                    # Check if story is AI/ML related
-                    text_to_check = (title + ' ' + text).lower()
-                    
-                    if any(keyword in text_to_check for keyword in ai_keywords):
-                        # Convert Unix timestamp to datetime
-                        pub_date = datetime.utcnow()
-                        if 'time' in story:
-                            pub_date = datetime.fromtimestamp(story['time'])
-                        
-                        items.append({
-                            "title": title,
-                            "url": url,
-                            "source": "hackernews",
-                            "content": text[:500] if text else title,
-                            "published_date": pub_date
-                        })
-                        print(f" ✓ Found AI/ML story: {title[:60]}...")
-                        
-                except Exception as e:
-                    print(f" ✗ Error fetching story {story_id}: {e}")
-                    continue
+            items = await fetch_hn_stories(client, story_ids, max_results, concurrency)
             
             print(f" ✓ Got {len(items)} AI/ML stories from HackerNews")
             return items
@@ -349,3 +561,106 @@ async def scrape_hackernews(max_results: int = 10) -> List[Dict]:
     except Exception as e:
         print(f" ✗ Error scraping HackerNews: {e}")
         return []
+
+
+async def fetch_hn_stories(
+    client: httpx.AsyncClient,
+    story_ids: List[int],
+    max_results: int,
+    concurrency: int = HN_FETCH_CONCURRENCY
+) -> List[Dict]:
+    """
+    Fetch HackerNews stories with bounded concurrency and keep the AI/ML ones
+    
+    Requests are started in ranking order behind a semaphore. As soon as the
+    contiguous prefix of finished stories holds `max_results` AI/ML stories,
+    the remaining requests are cancelled, so the result is the same as a
+    sequential scan of the ranking.
+    
+    Args:
+        client: Shared HTTP client
+        story_ids: Story IDs in topstories ranking order
+        max_results: Number of AI/ML stories to collect
+        concurrency: Maximum number of requests in flight at once
+        
+    Returns:
+        AI/ML stories in ranking order
+    """
+    if not story_ids or max_results <= 0:
+        return []
+    
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    results: List[Optional[Dict]] = [None] * len(story_ids)
+    finished = [False] * len(story_ids)
+    scan = {"cursor": 0, "found": 0}
+    done = asyncio.Event()
+    
+    def advance() -> None:
+        # Walk the finished prefix of the ranking and count matches
+        while scan["cursor"] < len(story_ids) and finished[scan["cursor"]]:
+            if results[scan["cursor"]]:
+                scan["found"] += 1
+            scan["cursor"] += 1
+            if scan["found"] >= max_results:
+                break
+        if scan["found"] >= max_results or scan["cursor"] == len(story_ids):
+            done.set()
+    
+    async def fetch_one(index: int, story_id: int) -> None:
+        async with semaphore:
+            if done.is_set():
+                return
+            try:
+                story_response = await client.get(HN_ITEM_URL.format(story_id))
+                results[index] = parse_hn_story(story_id, story_response.json())
+                if results[index]:
+                    print(f" ✓ Found AI/ML story: {results[index]['title'][:60]}...")
+            except Exception as e:
+                print(f" ✗ Error fetching story {story_id}: {e}")
+        finished[index] = True
+        advance()
+    
+    tasks = [asyncio.create_task(fetch_one(i, story_id)) for i, story_id in enumerate(story_ids)]
+    try:
+        await done.wait()
+    finally:
+        # Cancel anything still queued or in flight once we have enough
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    
+    return [item for item in results if item][:max_results]
+
+
+def parse_hn_story(story_id: int, story: Optional[Dict]) -> Optional[Dict]:
+    """
+    Convert a HackerNews API item into a news item if it is an AI/ML story
+    
+    Returns:
+        News item dict, or None if the item is not an AI/ML story
+    """
+    # Skip if not a story or no title
+    if not story or story.get('type') != 'story' or 'title' not in story:
+        return None
+    
+    title = story.get('title', '')
+    url = story.get('url', f"https://news.ycombinator.com/item?id={story_id}")
+    text = story.get('text', '')
+    
+    # Check if story is AI/ML related
+    text_to_check = (title + ' ' + text).lower()
+    if not any(keyword in text_to_check for keyword in HN_AI_KEYWORDS):
+        return None
+    
+    # Convert Unix timestamp to datetime
+    pub_date = datetime.utcnow()
+    if 'time' in story:
+        pub_date = datetime.fromtimestamp(story['time'])
+    
+    return {
+        "title": title,
+        "url": url,
+        "source": "hackernews",
+        "content": text[:500] if text else title,
+        "published_date": pub_date
+    }
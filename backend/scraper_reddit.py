@@ -1,36 +1,110 @@
 import praw
 import os
+import asyncio
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict
 
-# Load these from environment variables 
+# Load these from environment variables
 REDDIT_CLIENT_ID = os.getenv("REDDIT_CLIENT_ID")
 REDDIT_CLIENT_SECRET = os.getenv("REDDIT_CLIENT_SECRET")
 REDDIT_USER_AGENT = "PulseAI_Scraper/1.0"
 
-def get_reddit_headlines(subreddits=["MachineLearning", "artificial"], limit=5):
+REDDIT_SUBREDDITS = ["MachineLearning", "artificial"]
+
+# PRAW is synchronous and a Reddit instance must not be shared between threads,
+# so each worker thread keeps its own authenticated client for the life of the process
+_reddit_pool = ThreadPoolExecutor(
+    max_workers=int(os.getenv("REDDIT_FETCH_WORKERS", "2")),
+    thread_name_prefix="reddit"
+)
+_thread_local = threading.local()
+
+
+def get_reddit_client() -> praw.Reddit:
     """
-    Fetches top hot headlines from specified subreddits.
+    Get the Reddit client for the current thread, creating it on first use
     """
-    try:
+    reddit = getattr(_thread_local, "reddit", None)
+    if reddit is None:
         reddit = praw.Reddit(
             client_id=REDDIT_CLIENT_ID,
             client_secret=REDDIT_CLIENT_SECRET,
             user_agent=REDDIT_USER_AGENT
         )
-        
+        _thread_local.reddit = reddit
+    return reddit
+
+
+def normalize_post(post) -> Dict:
+    """
+    Convert a PRAW submission into the item schema shared by all scrapers
+    """
+    return {
+        "title": post.title,
+        "url": post.url,
+        "source": "reddit",
+        "content": post.selftext[:500] if post.selftext else post.title,  # First 500 chars of content
+        "published_date": datetime.utcfromtimestamp(post.created_utc)
+    }
+
+
+def fetch_subreddit(sub_name: str, limit: int = 5) -> List[Dict]:
+    """
+    Fetch hot posts from one subreddit (blocking, runs in the Reddit worker pool)
+    """
+    subreddit = get_reddit_client().subreddit(sub_name)
+    # scraping 'hot' posts
+    return [
+        normalize_post(post)
+        for post in subreddit.hot(limit=limit)
+        if not post.stickied  # Ignore pinned posts
+    ]
+
+
+async def scrape_reddit(subreddits: List[str] = None, limit: int = 5) -> List[Dict]:
+    """
+    Fetch hot headlines from all subreddits concurrently, off the event loop
+
+    Args:
+        subreddits: Subreddits to scrape (defaults to REDDIT_SUBREDDITS)
+        limit: Number of hot posts to read per subreddit
+
+    Returns:
+        List of news items, in subreddit order
+    """
+    if not REDDIT_CLIENT_ID or not REDDIT_CLIENT_SECRET:
+        print("  ⏭️  Reddit credentials not configured, skipping")
+        return []
+
+    subreddits = subreddits or REDDIT_SUBREDDITS
+    loop = asyncio.get_running_loop()
+
+    results = await asyncio.gather(
+        *(loop.run_in_executor(_reddit_pool, fetch_subreddit, sub_name, limit) for sub_name in subreddits),
+        return_exceptions=True
+    )
+
+    items = []
+    for sub_name, result in zip(subreddits, results):
+        if isinstance(result, Exception):
+            print(f"Error scraping r/{sub_name}: {result}")
+            continue
+        items.extend(result)
+
+    return items
+
+
+def get_reddit_headlines(subreddits=REDDIT_SUBREDDITS, limit=5):
+    """
+    Fetches top hot headlines from specified subreddits.
+    Blocking variant of scrape_reddit for scripts and synchronous callers.
+    """
+    try:
         results = []
-        
         for sub_name in subreddits:
-            subreddit = reddit.subreddit(sub_name)
-            # scraping 'hot' posts
-            for post in subreddit.hot(limit=limit):
-                if not post.stickied:  # Ignore pinned posts
-                    results.append({
-                        "source": f"r/{sub_name}",
-                        "title": post.title,
-                        "url": post.url,
-                        "score": post.score,
-                        "content": post.selftext[:500]  # First 500 chars of content
-                    })
+            results.extend(fetch_subreddit(sub_name, limit))
         return results
 
     except Exception as e:
@@ -40,4 +114,4 @@ def get_reddit_headlines(subreddits=["MachineLearning", "artificial"], limit=5):
 if __name__ == "__main__":
     data = get_reddit_headlines()
     for item in data:
-        print(f"[{item['source']}] {item['title']} ({item['score']} upvotes)")
\ No newline at end of file
+        print(f"[{item['source']}] {item['title']} ({item['published_date']:%Y-%m-%d})")
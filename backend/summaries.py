@@ -3,15 +3,54 @@ LLM-powered summarization using Groq API
 Generates 3-sentence summaries, social hooks, and auto-tags
 """
 import os
-from typing import Dict, List
-from groq import Groq
+import re
+import json
+import time
+import random
+import asyncio
+from typing import Dict, List, Optional, Tuple
+from groq import AsyncGroq, DefaultAsyncHttpxClient, RateLimitError
+
+from pydantic import ValidationError
+
+import summary_cache
+import tracing
+from models import SummaryContent
+from token_budget import count_tokens, strip_html, trim_to_tokens
 
 USE_MOCK_MODE = os.getenv("USE_MOCK_MODE", "False").lower() == "true"
 GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
 
+# Groq account limits for the model (requests and tokens per minute)
+GROQ_RPM = int(os.getenv("GROQ_RPM", "30"))
+GROQ_TPM = int(os.getenv("GROQ_TPM", "12000"))
+# Max chat completions in flight at once
+SUMMARY_CONCURRENCY = int(os.getenv("SUMMARY_CONCURRENCY", "8"))
+# Retries after a 429 before falling back to the mock summary
+SUMMARY_MAX_RETRIES = int(os.getenv("SUMMARY_MAX_RETRIES", "4"))
+# Token budgets: prompt content per item, and expected output per item (sizes max_tokens)
+SUMMARY_CONTENT_TOKENS = int(os.getenv("SUMMARY_CONTENT_TOKENS", "400"))
+SUMMARY_OUTPUT_TOKENS = int(os.getenv("SUMMARY_OUTPUT_TOKENS", "250"))
+# Extra output per entry of a batched response (its "id" field and separators)
+BATCH_ENTRY_OUTPUT_TOKENS = 10
+# News items fetched per page when working through the unsummarized backlog
+SUMMARY_PAGE_SIZE = int(os.getenv("SUMMARY_PAGE_SIZE", "100"))
+# Batched mode: several items per chat completion, sized to a token budget
+SUMMARY_BATCH_MODE = os.getenv("SUMMARY_BATCH_MODE", "True").lower() == "true"
+SUMMARY_BATCH_TOKEN_BUDGET = int(os.getenv("SUMMARY_BATCH_TOKEN_BUDGET", "6000"))  # Input + output per request
+SUMMARY_BATCH_MAX_ITEMS = int(os.getenv("SUMMARY_BATCH_MAX_ITEMS", "10"))
+# Bump whenever a prompt template below changes, so cached summaries are not reused
+PROMPT_VERSION = "3"
+
+SYSTEM_PROMPT = "You are an AI news analyst. Create unique, specific summaries. Never use generic phrases."
+
 # Configure Groq client
 if GROQ_API_KEY and not USE_MOCK_MODE:
-    client = Groq(api_key=GROQ_API_KEY)
+    client = AsyncGroq(
+        api_key=GROQ_API_KEY,
+        max_retries=0,  # 429s are retried by the scheduler below
+        http_client=DefaultAsyncHttpxClient(event_hooks=tracing.HTTP_EVENT_HOOKS)
+    )
     model = "llama-3.3-70b-versatile"  # Current fast model
 else:
     client = None
@@ -27,12 +66,146 @@ MOCK_SUMMARIES = {
 }
 
 
-def generate_summary(news_item: Dict) -> Dict:
+class TokenBucket:
+    """Bucket holding up to `per_minute` units, refilled continuously"""
+    
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.available = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+    
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` units are available"""
+        self._refill()
+        amount = min(amount, self.capacity)  # Oversized requests wait for a full bucket
+        return max(0.0, (amount - self.available) / self.rate)
+    
+    def consume(self, amount: float) -> None:
+        self.available -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """
+    Token-bucket scheduler for the Groq requests/minute and tokens/minute limits
+    
+    Callers are admitted in arrival order. A 429 pauses every caller until the
+    server's retry-after has passed.
+    """
+    
+    def __init__(self, requests_per_minute: int = GROQ_RPM, tokens_per_minute: int = GROQ_TPM):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.blocked_until = 0.0
+        self.rate_limited = 0
+        self._lock = None
+        self._loop = None
+    
+    def _get_lock(self) -> asyncio.Lock:
+        # Buckets are shared by every event loop, the lock belongs to one
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._lock = asyncio.Lock()
+            self._loop = loop
+        return self._lock
+    
+    async def acquire(self, tokens: int) -> None:
+        """Wait until one request of `tokens` estimated tokens fits both limits"""
+        async with self._get_lock():
+            while True:
+                wait = max(
+                    self.blocked_until - time.monotonic(),
+                    self.requests.wait_time(1),
+                    self.tokens.wait_time(tokens)
+                )
+                if wait <= 0:
+                    self.requests.consume(1)
+                    self.tokens.consume(tokens)
+                    return
+                await asyncio.sleep(wait)
+    
+    def backoff(self, seconds: float) -> None:
+        """Hold back all requests for `seconds` after a 429"""
+        self.rate_limited += 1
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+_rate_limiter = RateLimiter()
+
+
+def estimate_tokens(*texts: str) -> int:
+    """Token count of prompt texts, plus a little per-message overhead"""
+    return sum(count_tokens(text) + 4 for text in texts)
+
+
+def retry_delay(error: RateLimitError, attempt: int) -> float:
+    """Server-provided retry-after if any, else exponential backoff with jitter"""
+    retry_after = None
+    if getattr(error, "response", None) is not None:
+        retry_after = error.response.headers.get("retry-after")
+    try:
+        return float(retry_after)
+    except (TypeError, ValueError):
+        return min(60.0, 2 ** attempt) + random.uniform(0, 1)
+
+
+def prepare_item(news_item: Dict) -> Tuple[str, str]:
+    """Title and prompt content of a news item, cleaned and trimmed to the token budget"""
+    title = strip_html(news_item.get("title", ""))
+    content = trim_to_tokens(strip_html(news_item.get("content") or ""), SUMMARY_CONTENT_TOKENS)
+    
+    # If content is too short, use title as the main context
+    if len(content) < 50:
+        content = title
+    return title, content
+
+
+async def complete(messages: List[Dict], max_tokens: int, limiter: RateLimiter, label: str,
+                   json_mode: bool = False, items: int = 1) -> str:
+    """
+    Run one chat completion through the rate limiter, retrying 429s
+    
+    Args:
+        json_mode: Ask Groq to constrain the output to a JSON object
+        items: News items covered by the request, for per-item token stats
+    
+    Returns:
+        The response text
+    """
+    extra = {"response_format": {"type": "json_object"}} if json_mode else {}
+    for attempt in range(SUMMARY_MAX_RETRIES + 1):
+        await limiter.acquire(estimate_tokens(*(m["content"] for m in messages)) + max_tokens)
+        try:
+            response = await client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=0.7,
+                max_tokens=max_tokens,
+                **extra
+            )
+            record_tokens(response, items, max_tokens)
+            return response.choices[0].message.content
+        except RateLimitError as e:
+            if attempt == SUMMARY_MAX_RETRIES:
+                raise
+            delay = retry_delay(e, attempt)
+            print(f"⏳ Rate limited, retrying in {delay:.1f}s: {label}")
+            limiter.backoff(delay)
+
+
+async def generate_summary(news_item: Dict, limiter: Optional[RateLimiter] = None, use_cache: bool = True) -> Dict:
     """
     Generate a comprehensive summary for a news item using Groq
     
     Args:
         news_item: News item with title and content
+        limiter: Rate limiter to schedule the request with (shared one by default)
+        use_cache: Look the item up in the summary cache first
         
     Returns:
         Dictionary with summary, social hook, and tags
@@ -41,12 +214,14 @@ def generate_summary(news_item: Dict) -> Dict:
         print("⚠️ Using mock mode for summaries")
         return generate_mock_summary(news_item)
     
-    title = news_item.get("title", "")
-    content = news_item.get("content", "")[:2000]  # Limit content length
+    title, content = prepare_item(news_item)
     
-    # If content is too short, use title as the main context
-    if len(content) < 50:
-        content = title
+    key = summary_cache.cache_key(model, PROMPT_VERSION, title, content)
+    if use_cache:
+        cached = await summary_cache.get_summary(key)
+        if cached:
+            print(f"💾 Cached summary for: {title[:50]}")
+            return {"news_item_id": news_item.get("id"), **cached}
     
     prompt = f"""Analyze this AI/ML news and create:
 
@@ -59,28 +234,30 @@ Content: {content}
 
 IMPORTANT: Make each summary unique and specific to THIS article. Mention specific technologies, companies, or achievements from the content.
 
-Format:
-SUMMARY: [your unique 3-sentence summary]
-HOOK: [your 30-word hook]
-TAGS: [tag1, tag2, tag3, tag4, tag5]"""
+Respond with only a JSON object in this format:
+{{"three_sentence_summary": "...", "social_hook": "...", "tags": ["tag1", "tag2", "tag3"]}}"""
 
     try:
         print(f"🤖 Generating summary for: {title[:50]}...")
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": "You are an AI news analyst. Create unique, specific summaries. Never use generic phrases."},
+        result_text = await complete(
+            [
+                {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": prompt}
             ],
-            temperature=0.7,
-            max_tokens=500
+            output_budget(1),
+            limiter or _rate_limiter,
+            title[:50],
+            json_mode=True
         )
-        
-        result_text = response.choices[0].message.content
         print(f"✅ Generated summary successfully")
         
         # Parse the response
         parsed = parse_llm_response(result_text)
+        if parsed is None:
+            print(f"⚠️ Unparseable summary, using default for: {title[:50]}")
+            parsed = MOCK_SUMMARIES["default"]
+        else:
+            await summary_cache.store_summary(key, model, PROMPT_VERSION, parsed)
         
         return {
             "news_item_id": news_item.get("id"),
@@ -94,6 +271,132 @@ TAGS: [tag1, tag2, tag3, tag4, tag5]"""
         return generate_mock_summary(news_item)
 
 
+def build_batch_prompt(entries: List[Tuple[str, str]]) -> str:
+    """Prompt asking for a JSON array with one summary per (title, content) entry"""
+    articles = "\n\n".join(
+        f"[{number}] Title: {title}\nContent: {content}"
+        for number, (title, content) in enumerate(entries, start=1)
+    )
+    return f"""Analyze each of the following {len(entries)} AI/ML news articles and create, for each one:
+
+1. A 3-sentence summary (specific, technical, informative)
+2. A 30-word social media hook (engaging with hashtags)
+3. 3-5 relevant tags
+
+{articles}
+
+IMPORTANT: Make each summary unique and specific to ITS article. Mention specific technologies, companies, or achievements from the content.
+
+Respond with only a JSON array, one object per article, in this format:
+[{{"id": 1, "three_sentence_summary": "...", "social_hook": "...", "tags": ["tag1", "tag2", "tag3"]}}]"""
+
+
+def output_budget(count: int) -> int:
+    """
+    max_tokens for a response carrying count summaries: the expected output
+    of each item, plus the id and separators of each entry when batched
+    """
+    if count == 1:
+        return SUMMARY_OUTPUT_TOKENS
+    return count * (SUMMARY_OUTPUT_TOKENS + BATCH_ENTRY_OUTPUT_TOKENS)
+
+
+def pack_batches(entries: List[Tuple], token_budget: int = SUMMARY_BATCH_TOKEN_BUDGET,
+                 max_items: int = SUMMARY_BATCH_MAX_ITEMS) -> List[List[Tuple]]:
+    """
+    Group (index, title, content, key) entries into batches that fit the token budget
+    
+    K adapts to the input: many short items share a request, long ones get
+    fewer companions. An item too large for the budget still gets a batch of its own.
+    """
+    base = estimate_tokens(SYSTEM_PROMPT, build_batch_prompt([]))
+    batches = []
+    current = []
+    used = base
+    
+    for entry in entries:
+        _, title, content, _ = entry
+        # Prompt tokens of the entry plus its share of the output (see output_budget)
+        cost = estimate_tokens(title, content) + 10 + SUMMARY_OUTPUT_TOKENS + BATCH_ENTRY_OUTPUT_TOKENS
+        if current and (used + cost > token_budget or len(current) >= max_items):
+            batches.append(current)
+            current = []
+            used = base
+        current.append(entry)
+        used += cost
+    
+    if current:
+        batches.append(current)
+    return batches
+
+
+def parse_batch_response(response: str, count: int) -> Dict[int, Dict]:
+    """
+    Parse a batched JSON response
+    
+    Only the parsed entries are recorded in the parse stats: the others
+    are retried one by one and counted by the outcome of that retry
+    
+    Returns:
+        Parsed summaries by 0-based position in the batch; entries that are
+        missing or malformed are left out
+    """
+    entries = load_json(response or "", opener="[")
+    
+    parsed = {}
+    repaired = 0
+    for position, entry in enumerate(entries if isinstance(entries, list) else []):
+        if not isinstance(entry, dict):
+            continue
+        try:
+            number = int(entry.get("id", position + 1))
+        except (TypeError, ValueError):
+            continue
+        if not 1 <= number <= count or number - 1 in parsed:
+            continue
+        
+        summary, was_repaired = validate_summary(entry)
+        if summary is not None:
+            parsed[number - 1] = summary
+            repaired += was_repaired
+    
+    record_parse("parsed", len(parsed) - repaired)
+    record_parse("repaired", repaired)
+    return parsed
+
+
+async def summarize_batch(entries: List[Tuple], limiter: Optional[RateLimiter] = None) -> Dict[int, Dict]:
+    """
+    Summarize a packed batch of (index, title, content, key) entries in one request
+    
+    Returns:
+        Parsed summaries by position in the batch (see parse_batch_response)
+    """
+    prompt = build_batch_prompt([(title, content) for _, title, content, _ in entries])
+    try:
+        print(f"🤖 Generating {len(entries)} summaries in one request...")
+        result_text = await complete(
+            [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            output_budget(len(entries)),
+            limiter or _rate_limiter,
+            f"batch of {len(entries)}",
+            items=len(entries)
+        )
+    except Exception as e:
+        print(f"❌ Error generating batched summaries with Groq: {e}")
+        return {}
+    
+    parsed = parse_batch_response(result_text, len(entries))
+    print(f"✅ Parsed {len(parsed)}/{len(entries)} batched summaries")
+    await summary_cache.store_summaries(model, PROMPT_VERSION, {
+        entries[position][3]: summary for position, summary in parsed.items()
+    })
+    return parsed
+
+
 def generate_mock_summary(news_item: Dict) -> Dict:
     """
     Generate a mock summary based on title and content
@@ -155,58 +458,299 @@ def extract_key_terms(text: str) -> List[str]:
     return found_terms[:10]
 
 
-def parse_llm_response(response: str) -> Dict:
+FIELD_ALIASES = {
+    "three_sentence_summary": ("three_sentence_summary", "summary"),
+    "social_hook": ("social_hook", "hook"),
+    "tags": ("tags", "tag")
+}
+
+# Structured-output outcomes and token usage since startup, reported by /stats/summaries
+_parse_stats = {"parsed": 0, "repaired": 0, "failed": 0}
+_token_stats = {"requests": 0, "items": 0, "prompt_tokens": 0, "completion_tokens": 0}
+# The same counters (plus requested max_tokens) per number of items in a request,
+# so single and batched requests can be compared per item
+_token_stats_by_size: Dict[int, Dict[str, int]] = {}
+
+
+def record_parse(outcome: str, count: int = 1) -> None:
+    _parse_stats[outcome] += count
+
+
+def record_tokens(response, items: int, max_tokens: int = 0) -> None:
+    usage = getattr(response, "usage", None)
+    prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+    completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+    _token_stats["requests"] += 1
+    _token_stats["items"] += items
+    _token_stats["prompt_tokens"] += prompt_tokens
+    _token_stats["completion_tokens"] += completion_tokens
+    
+    by_size = _token_stats_by_size.setdefault(items, dict.fromkeys(
+        ("requests", "items", "prompt_tokens", "completion_tokens", "max_tokens"), 0
+    ))
+    by_size["requests"] += 1
+    by_size["items"] += items
+    by_size["prompt_tokens"] += prompt_tokens
+    by_size["completion_tokens"] += completion_tokens
+    by_size["max_tokens"] += max_tokens
+    tracing.count("llm_calls")
+    tracing.count("llm_tokens", getattr(usage, "total_tokens", 0) or 0)
+
+
+def get_summary_stats() -> Dict:
+    """
+    Parse outcomes of LLM responses (failures are paid calls that were wasted)
+    and token usage per summarized item, overall and by items per request
+    ("output_used" is completion tokens over the max_tokens requested)
+    """
+    total = sum(_parse_stats.values())
+    items = _token_stats["items"]
+    return {
+        **_parse_stats,
+        "failure_rate": round(_parse_stats["failed"] / total, 4) if total else 0.0,
+        "rate_limited": _rate_limiter.rate_limited,
+        **_token_stats,
+        "prompt_tokens_per_item": round(_token_stats["prompt_tokens"] / items, 1) if items else 0.0,
+        "completion_tokens_per_item": round(_token_stats["completion_tokens"] / items, 1) if items else 0.0,
+        "by_batch_size": {
+            size: {
+                "requests": stats["requests"],
+                "prompt_tokens_per_item": round(stats["prompt_tokens"] / stats["items"], 1),
+                "completion_tokens_per_item": round(stats["completion_tokens"] / stats["items"], 1),
+                "max_tokens_per_item": round(stats["max_tokens"] / stats["items"], 1),
+                "output_used": round(stats["completion_tokens"] / stats["max_tokens"], 4) if stats["max_tokens"] else 0.0
+            }
+            for size, stats in sorted(_token_stats_by_size.items())
+        }
+    }
+
+
+def repair_json(text: str) -> str:
+    """
+    Best-effort fix of common LLM JSON mistakes: code fences, smart quotes,
+    trailing commas and output cut off by max_tokens (unclosed strings/brackets)
+    """
+    text = re.sub(r"```(?:json)?", "", text).strip()
+    text = text.replace("\u201c", '"').replace("\u201d", '"')
+    text = re.sub(r",\s*([}\]])", r"\1", text)
+    
+    closers = []
+    in_string = escaped = False
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            closers.append("}" if char == "{" else "]")
+        elif char in "}]" and closers:
+            closers.pop()
+    
+    if in_string:
+        text += '"'
+    text = re.sub(r",\s*$", "", text)
+    return text + "".join(reversed(closers))
+
+
+def load_json(text: str, opener: str = "{"):
+    """Decode the first JSON object (or array) in text, repairing it if needed"""
+    closer = "}" if opener == "{" else "]"
+    start = text.find(opener)
+    if start == -1:
+        return None
+    end = text.rfind(closer)
+    candidate = text[start:end + 1] if end > start else text[start:]
+    
+    for attempt in (candidate, repair_json(text[start:]), repair_json(candidate)):
+        try:
+            return json.loads(attempt)
+        except json.JSONDecodeError:
+            continue
+    return None
+
+
+def validate_summary(data: Dict) -> Tuple[Optional[Dict], bool]:
+    """
+    Validate decoded fields against the Summary schema, filling gaps where possible
+    
+    A missing hook is rebuilt from the summary's first sentence and missing tags
+    from its key terms; a missing summary cannot be repaired.
+    
+    Returns:
+        Tuple of (summary fields or None, whether anything was repaired)
+    """
+    if not isinstance(data, dict):
+        return None, False
+    
+    fields = {}
+    for field, aliases in FIELD_ALIASES.items():
+        for alias in aliases:
+            if data.get(alias):
+                fields[field] = data[alias]
+                break
+    
+    repaired = False
+    if isinstance(fields.get("tags"), str):
+        fields["tags"] = fields["tags"].strip("[]").split(",")
+    if isinstance(fields.get("tags"), list):
+        fields["tags"] = [str(tag).strip().strip('"') for tag in fields["tags"] if str(tag).strip()]
+    
+    summary = fields.get("three_sentence_summary")
+    if not isinstance(summary, str) or not summary.strip():
+        return None, False
+    if not isinstance(fields.get("social_hook"), str) or not fields["social_hook"].strip():
+        fields["social_hook"] = re.split(r"(?<=[.!?])\s", summary.strip())[0][:280]
+        repaired = True
+    if not fields.get("tags"):
+        fields["tags"] = extract_key_terms(summary)[:5] or ["AI"]
+        repaired = True
+    
+    try:
+        return SummaryContent(**fields).model_dump(), repaired
+    except ValidationError:
+        return None, False
+
+
+def parse_llm_response(response: str) -> Optional[Dict]:
     """
     Parse LLM response into structured format
     
+    Tries, in order: the JSON object the prompt asks for (repaired if
+    malformed), individual JSON fields recovered by pattern, and the legacy
+    SUMMARY:/HOOK:/TAGS: lines. Outcomes are counted in the parse stats.
+    
     Args:
         response: Raw LLM response
         
     Returns:
-        Structured dictionary
+        Structured dictionary, or None if no summary could be recovered
     """
-    lines = response.strip().split('\n')
-    
-    summary = ""
-    hook = ""
-    tags = []
-    
-    for line in lines:
-        line = line.strip()
-        if line.startswith("SUMMARY:"):
-            summary = line.replace("SUMMARY:", "").strip()
-        elif line.startswith("HOOK:"):
-            hook = line.replace("HOOK:", "").strip()
-        elif line.startswith("TAGS:"):
-            tags_str = line.replace("TAGS:", "").strip()
-            tags = [t.strip() for t in tags_str.replace("[", "").replace("]", "").split(",")]
+    response = response or ""
+    parsed, repaired = validate_summary(load_json(response))
     
-    # Fallback if parsing fails
-    if not summary or not hook:
-        return MOCK_SUMMARIES["default"]
+    if parsed is None:
+        # Recover whatever string fields survived, e.g. from badly broken JSON
+        recovered = {}
+        for field, aliases in FIELD_ALIASES.items():
+            for alias in aliases:
+                match = re.search(rf'"{alias}"\s*:\s*"((?:[^"\\]|\\.)*)', response)
+                if match:
+                    recovered[field] = match.group(1).replace('\\"', '"')
+                    break
+        
+        # Legacy line format
+        for line in response.strip().split('\n'):
+            line = line.strip()
+            if line.startswith("SUMMARY:"):
+                recovered.setdefault("three_sentence_summary", line.replace("SUMMARY:", "").strip())
+            elif line.startswith("HOOK:"):
+                recovered.setdefault("social_hook", line.replace("HOOK:", "").strip())
+            elif line.startswith("TAGS:"):
+                recovered.setdefault("tags", line.replace("TAGS:", "").strip())
+        
+        parsed, _ = validate_summary(recovered)
+        repaired = parsed is not None
     
-    return {
-        "three_sentence_summary": summary,
-        "social_hook": hook,
-        "tags": tags
-    }
+    record_parse("failed" if parsed is None else "repaired" if repaired else "parsed")
+    return parsed
 
 
-def batch_summarize(news_items: List[Dict]) -> List[Dict]:
+async def batch_summarize(news_items: List[Dict], concurrency: int = SUMMARY_CONCURRENCY,
+                          batch_mode: bool = SUMMARY_BATCH_MODE) -> List[Dict]:
     """
-    Generate summaries for multiple news items
+    Generate summaries for multiple news items concurrently
     
     Args:
         news_items: List of news items
+        concurrency: Max requests in flight; the rate limiter paces them further
+        batch_mode: Pack several items into each request (see pack_batches);
+            items whose entry fails to parse are retried one by one
         
     Returns:
-        List of summaries
+        List of summaries, in the same order as news_items
     """
-    summaries = []
+    semaphore = asyncio.Semaphore(concurrency)
+    summaries: List[Optional[Dict]] = [None] * len(news_items)
     
-    for item in news_items:
-        summary = generate_summary(item)
-        summary["news_item_id"] = item.get("id")
-        summaries.append(summary)
+    async def summarize(index: int, use_cache: bool = True) -> None:
+        async with semaphore:
+            summaries[index] = await generate_summary(news_items[index], use_cache=use_cache)
     
+    async def summarize_packed(batch: List[Tuple]) -> None:
+        async with semaphore:
+            parsed = await summarize_batch(batch)
+        for position, summary in parsed.items():
+            summaries[batch[position][0]] = summary
+    
+    if client and not USE_MOCK_MODE:
+        entries = []
+        for index, item in enumerate(news_items):
+            title, content = prepare_item(item)
+            entries.append((index, title, content, summary_cache.cache_key(model, PROMPT_VERSION, title, content)))
+        
+        # One cache query for the whole list
+        cached = await summary_cache.get_summaries([key for _, _, _, key in entries])
+        pending = []
+        for entry in entries:
+            if entry[3] in cached:
+                summaries[entry[0]] = dict(cached[entry[3]])
+            else:
+                pending.append(entry)
+        
+        if batch_mode:
+            await asyncio.gather(*(summarize_packed(batch) for batch in pack_batches(pending)))
+            
+            failed = [index for index, _, _, _ in pending if summaries[index] is None]
+            if failed:
+                print(f"⚠️ Retrying {len(failed)} unparsed batch entries one by one")
+            await asyncio.gather(*(summarize(index, use_cache=False) for index in failed))
+        else:
+            await asyncio.gather(*(summarize(index, use_cache=False) for index, _, _, _ in pending))
+    else:
+        await asyncio.gather(*(summarize(index) for index in range(len(news_items))))
+    
+    for item, summary in zip(news_items, summaries):
+        summary["news_item_id"] = item.get("id")
+    if client:
+        await summary_cache.evict()
     return summaries
+
+
+async def summarize_backlog(db, page_size: int = SUMMARY_PAGE_SIZE) -> int:
+    """
+    Summarize every news item that has no summary yet, one page at a time
+    
+    Args:
+        db: Database session
+        page_size: News items fetched and summarized per round
+        
+    Returns:
+        Number of summaries saved
+    """
+    from db import get_unsummarized_news_items, bulk_save_summaries
+    
+    saved = 0
+    after_id = 0
+    while True:
+        # Paging on id also skips items whose summary failed to save this run
+        page = get_unsummarized_news_items(db, after_id=after_id, limit=page_size)
+        if not page:
+            return saved
+        after_id = page[-1].id
+        
+        news_items = [
+            {
+                "id": item.id,
+                "title": item.title,
+                "content": item.content,
+                "url": item.url
+            }
+            for item in page
+        ]
+        _, inserted = bulk_save_summaries(db, await batch_summarize(news_items))
+        saved += inserted
@@ -0,0 +1,112 @@
+"""
+Persistent cache of LLM summaries
+Items that reappear (re-scraped, re-summarised by /summaries/generate, the
+cron refresh or the agent) are answered from the database instead of Groq
+"""
+import os
+import asyncio
+import hashlib
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+from db import (
+    SessionLocal, get_cached_summaries, save_cached_summaries,
+    evict_summary_cache, count_cached_summaries
+)
+
+SUMMARY_CACHE_TTL_DAYS = float(os.getenv("SUMMARY_CACHE_TTL_DAYS", "30"))
+SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", "5000"))
+
+# Process-wide counters, reported by /stats/summary-cache
+_stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+
+def cache_key(model: str, prompt_version: str, title: str, content: str) -> str:
+    """Hash of everything that determines the LLM output"""
+    payload = "\x1f".join([model or "", prompt_version, title or "", content or ""])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _lookup(keys: List[str]) -> Dict[str, Dict]:
+    db = SessionLocal()
+    try:
+        return get_cached_summaries(db, keys, timedelta(days=SUMMARY_CACHE_TTL_DAYS))
+    finally:
+        db.close()
+
+
+def _store(model: str, prompt_version: str, summaries: Dict[str, Dict]) -> None:
+    db = SessionLocal()
+    try:
+        save_cached_summaries(db, model, prompt_version, summaries)
+    finally:
+        db.close()
+
+
+def _evict() -> int:
+    db = SessionLocal()
+    try:
+        return evict_summary_cache(db, timedelta(days=SUMMARY_CACHE_TTL_DAYS), SUMMARY_CACHE_MAX_ENTRIES)
+    finally:
+        db.close()
+
+
+# The cache lives in the database; its queries run in a worker thread so
+# they do not block the event loop the summaries are generated on
+
+async def get_summaries(keys: List[str]) -> Dict[str, Dict]:
+    """Cached summaries for any of the keys, in one query (counts hits and misses)"""
+    found = await asyncio.to_thread(_lookup, keys)
+    _stats["hits"] += sum(1 for key in keys if key in found)
+    _stats["misses"] += sum(1 for key in keys if key not in found)
+    return found
+
+
+async def get_summary(key: str) -> Optional[Dict]:
+    """Cached summary for a key, or None (counts a hit or a miss)"""
+    return (await get_summaries([key])).get(key)
+
+
+async def store_summaries(model: str, prompt_version: str, summaries: Dict[str, Dict]) -> None:
+    """Cache summaries produced by the LLM, by key"""
+    if not summaries:
+        return
+    await asyncio.to_thread(_store, model, prompt_version, {
+        key: {
+            "three_sentence_summary": summary["three_sentence_summary"],
+            "social_hook": summary["social_hook"],
+            "tags": summary["tags"]
+        }
+        for key, summary in summaries.items()
+    })
+    _stats["stores"] += len(summaries)
+
+
+async def store_summary(key: str, model: str, prompt_version: str, summary: Dict) -> None:
+    """Cache a summary produced by the LLM"""
+    await store_summaries(model, prompt_version, {key: summary})
+
+
+async def evict() -> int:
+    """Apply TTL and size limits; returns the number of entries removed"""
+    deleted = await asyncio.to_thread(_evict)
+    _stats["evictions"] += deleted
+    return deleted
+
+
+def get_cache_stats() -> Dict:
+    """Hit/miss counters since startup plus the current cache size"""
+    db = SessionLocal()
+    try:
+        entries = count_cached_summaries(db)
+    finally:
+        db.close()
+
+    lookups = _stats["hits"] + _stats["misses"]
+    return {
+        **_stats,
+        "entries": entries,
+        "hit_rate": round(_stats["hits"] / lookups, 4) if lookups else 0.0,
+        "ttl_days": SUMMARY_CACHE_TTL_DAYS,
+        "max_entries": SUMMARY_CACHE_MAX_ENTRIES
+    }
@@ -11,7 +11,6 @@ from sqlalchemy.orm import Session
 
 from agent import run_agent
 from db import get_db, save_daily_report, save_weekly_report, get_summaries_by_date, SessionLocal
-from summaries import batch_summarize
 
 
 async def daily_task():
@@ -0,0 +1,68 @@
+"""
+Token budgeting for LLM prompts
+Cleans scraped text and trims it to a token count at sentence boundaries,
+so prompts carry only as much content as the summary needs
+"""
+import re
+import html
+from typing import List
+from bs4 import BeautifulSoup
+
+try:
+    import tiktoken
+    # cl100k_base is close to the Llama 3 BPE vocabulary served by Groq
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:  # tiktoken missing, or its vocabulary cannot be downloaded
+    _encoding = None
+
+CHARS_PER_TOKEN = 4  # Fallback estimate without tiktoken
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_HTML_HINT = re.compile(r"<[a-zA-Z/!][^>]*>")
+
+
+def count_tokens(text: str) -> int:
+    """Number of tokens in text"""
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def strip_html(text: str) -> str:
+    """Plain text of an HTML fragment, with entities decoded and whitespace collapsed"""
+    if not text:
+        return ""
+    if _HTML_HINT.search(text):
+        text = BeautifulSoup(text, "lxml").get_text(" ")
+    return re.sub(r"\s+", " ", html.unescape(text)).strip()
+
+
+def split_sentences(text: str) -> List[str]:
+    return [sentence for sentence in _SENTENCE_END.split(text) if sentence]
+
+
+def trim_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Keep whole sentences from the start of text until max_tokens is reached
+
+    A first sentence longer than the budget is cut at the token limit instead.
+    """
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    kept = []
+    used = 0
+    for sentence in split_sentences(text):
+        tokens = count_tokens(sentence + " ")
+        if used + tokens > max_tokens:
+            break
+        kept.append(sentence)
+        used += tokens
+
+    if kept:
+        return " ".join(kept)
+    if _encoding is not None:
+        return _encoding.decode(_encoding.encode(text, disallowed_special=())[:max_tokens])
+    return text[:max_tokens * CHARS_PER_TOKEN]
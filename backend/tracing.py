@@ -0,0 +1,167 @@
+"""
+Per-node tracing for agent runs
+Records wall time, items in/out, LLM calls and tokens, HTTP requests and bytes,
+and peak traced memory for every node and for the run as a whole, and stores
+one node_metrics row per span
+"""
+import os
+import time
+import asyncio
+import tracemalloc
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional, Union
+import httpx
+
+# tracemalloc slows every allocation in the process while it runs; opt in to profile
+TRACE_MEMORY = os.getenv("TRACE_MEMORY", "False").lower() == "true"
+
+COUNTERS = ("llm_calls", "llm_tokens", "http_requests", "http_bytes")
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("trace_span", default=None)
+_current_run: ContextVar[Optional[str]] = ContextVar("trace_run", default=None)
+
+# Spans open in this process; the tracemalloc peak is only reset when none is
+_open_spans = 0
+
+
+class Span:
+    """Counters for one node (or a whole run); child spans roll up into their parent"""
+
+    def __init__(self, node: str, parent: Optional["Span"] = None):
+        self.node = node
+        self.parent = parent
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.items_in = 0
+        self.items_out = 0
+        self.peak_memory = 0
+        self.wall_time = 0.0
+        self.error: Optional[str] = None
+
+    def add(self, counter: str, amount: int = 1) -> None:
+        self.counters[counter] += amount
+
+    def close_into_parent(self) -> None:
+        if self.parent is None:
+            return
+        for counter, value in self.counters.items():
+            self.parent.counters[counter] += value
+        self.parent.peak_memory = max(self.parent.peak_memory, self.peak_memory)
+
+
+def count(counter: str, amount: int = 1) -> None:
+    """Add to a counter of the span running in this context (no-op outside a span)"""
+    span = _current_span.get()
+    if span is not None:
+        span.add(counter, amount)
+
+
+def _save(run_id: str, span: Span, started_at) -> None:
+    """Store a span's metrics (blocking; trace_span runs it in a worker thread)"""
+    from db import SessionLocal, save_node_metric
+
+    db = SessionLocal()
+    try:
+        save_node_metric(db, {
+            "run_id": run_id,
+            "node": span.node,
+            "started_at": started_at,
+            "wall_time": round(span.wall_time, 4),
+            "items_in": span.items_in,
+            "items_out": span.items_out,
+            "peak_memory": span.peak_memory,
+            "error": span.error,
+            **span.counters
+        })
+    finally:
+        db.close()
+
+
+@asynccontextmanager
+async def trace_span(node: str, run_id: Optional[str] = None):
+    """
+    Trace a node (or, with run_id, a whole run) and store its metrics
+
+    With TRACE_MEMORY, tracemalloc is started once for the process and
+    peak memory is the highest traced allocation above the level at span
+    start. The peak is shared by overlapping spans (parallel branches, a
+    run and its nodes), so theirs is an upper bound.
+    """
+    from datetime import datetime
+    global _open_spans
+
+    run_token = _current_run.set(run_id) if run_id else None
+    run_id = _current_run.get()
+    span = Span(node, _current_span.get())
+    span_token = _current_span.set(span)
+
+    if TRACE_MEMORY:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if _open_spans == 0:
+            tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0] if TRACE_MEMORY else 0
+    _open_spans += 1
+
+    started_at = datetime.utcnow()
+    start = time.perf_counter()
+    try:
+        yield span
+    except Exception as e:
+        span.error = str(e)
+        raise
+    finally:
+        span.wall_time = time.perf_counter() - start
+        _open_spans -= 1
+        if TRACE_MEMORY and tracemalloc.is_tracing():
+            span.peak_memory = max(span.peak_memory, tracemalloc.get_traced_memory()[1] - baseline, 0)
+
+        _current_span.reset(span_token)
+        span.close_into_parent()
+        if run_id:
+            # Off the event loop, so a slow or locked database never stalls the graph
+            await asyncio.to_thread(_save, run_id, span, started_at)
+        if run_token is not None:
+            _current_run.reset(run_token)
+
+
+def traced_node(name: str, node: Callable, items_in: Optional[str] = None,
+                items_out: Union[str, Callable[[Dict], int], None] = None) -> Callable:
+    """
+    Wrap a LangGraph node so every call is traced
+
+    Args:
+        name: Node name stored with the metrics
+        node: The node coroutine
+        items_in: State key whose list length counts as the node's input
+        items_out: Update key whose list length counts as its output, or a
+            function computing the output count from the update
+    """
+    async def traced(state: Dict) -> Dict:
+        async with trace_span(name) as span:
+            span.items_in = len(state.get(items_in) or []) if items_in else 0
+            update = await node(state)
+            if callable(items_out):
+                span.items_out = items_out(update)
+            elif items_out:
+                span.items_out = len(update.get(items_out) or [])
+            return update
+
+    traced.__name__ = getattr(node, "__name__", name)
+    return traced
+
+
+async def trace_response(response: httpx.Response) -> None:
+    """httpx response hook counting requests and response bytes into the current span"""
+    if _current_span.get() is None:
+        return
+    size = response.headers.get("content-length")
+    if size is None:
+        await response.aread()
+        size = len(response.content)
+    count("http_requests")
+    count("http_bytes", int(size))
+
+
+# Pass as event_hooks= to the httpx.AsyncClients the pipeline creates
+HTTP_EVENT_HOOKS = {"response": [trace_response]}
@@ -0,0 +1,139 @@
+"""
+Canonical URL index: first-pass dedupe filter
+Normalises URLs (scheme, host, tracking params, arXiv abs/pdf variants) and
+keeps every stored canonical URL in an in-memory set, so exact duplicates are
+rejected in O(1) before the similarity stages run
+"""
+import re
+from typing import Dict, List, Set, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Click and campaign ids that only track the visitor and never change the page;
+# generic names such as ref, source or src are kept, as many sites route on them
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "gbraid", "wbraid", "msclkid", "yclid", "twclid",
+    "ttclid", "li_fat_id", "igshid", "mc_cid", "mc_eid", "_hsenc", "_hsmi",
+}
+TRACKING_PREFIXES = ("utm_",)
+
+ARXIV_HOSTS = {"arxiv.org", "export.arxiv.org"}
+ARXIV_ID = re.compile(r"^/(?:abs|pdf|html)/(.+?)(?:v\d+)?(?:\.pdf)?/?$")
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalise a URL so trivially different links to the same page compare equal
+
+    - http and https are treated the same, host is lower-cased, "www." dropped
+    - default ports, fragments and trailing slashes are removed
+    - tracking parameters are removed and the rest sorted
+    - arXiv abs/pdf/html links (any version) map to arxiv.org/abs/<id>
+    """
+    if not url:
+        return ""
+
+    parts = urlsplit(url.strip())
+    if not parts.netloc:
+        return url.strip()
+
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path or "/"
+    if host in ARXIV_HOSTS:
+        match = ARXIV_ID.match(path)
+        if match:
+            return f"https://arxiv.org/abs/{match.group(1)}"
+        host = "arxiv.org"
+
+    path = re.sub(r"/{2,}", "/", path)
+    if len(path) > 1:
+        path = path.rstrip("/")
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+
+class UrlIndex:
+    """In-memory set of canonical URLs with hit-rate counters"""
+
+    def __init__(self):
+        self._urls: Set[str] = set()
+        self.warmed = False
+        self.lookups = 0
+        self.hits = 0
+
+    def __len__(self) -> int:
+        return len(self._urls)
+
+    def __contains__(self, url: str) -> bool:
+        return canonicalize_url(url) in self._urls
+
+    def add(self, url: str) -> None:
+        if url:
+            self._urls.add(canonicalize_url(url))
+
+    def warm(self, db, batch_size: int = 5000) -> int:
+        """
+        Load the canonical form of every stored news item URL
+
+        Returns:
+            Number of URLs in the index
+        """
+        from db import NewsItemDB
+
+        for (url,) in db.query(NewsItemDB.url).yield_per(batch_size):
+            self.add(url)
+        self.warmed = True
+        return len(self)
+
+    def filter(self, items: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Split items into (new, exact duplicates) by canonical URL
+
+        Checks both stored URLs and earlier items of the same batch. The
+        index itself is only updated when items are saved.
+        """
+        new_items = []
+        duplicate_items = []
+        batch: Set[str] = set()
+
+        for item in items:
+            canonical = canonicalize_url(item.get("url", ""))
+            self.lookups += 1
+            if canonical and (canonical in self._urls or canonical in batch):
+                self.hits += 1
+                item["is_duplicate"] = True
+                item["novelty_score"] = 0.0
+                duplicate_items.append(item)
+            else:
+                batch.add(canonical)
+                new_items.append(item)
+
+        return new_items, duplicate_items
+
+    def stats(self) -> Dict:
+        return {
+            "urls": len(self),
+            "warmed": self.warmed,
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / self.lookups, 4) if self.lookups else 0.0
+        }
+
+
+_url_index = UrlIndex()
+
+
+def get_url_index(db=None) -> UrlIndex:
+    """Get the process-wide URL index, warming it from the database on first use"""
+    if db is not None and not _url_index.warmed:
+        _url_index.warm(db)
+    return _url_index